@@ -1,21 +1,64 @@
+import os
+import click
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
 from .config import Config
-from .models import db, bcrypt
+from .models import db
+from .utils.qr_cache import QRCodeCache
+from .utils.report_cache import ReportCache
+from .utils.passwords import PasswordHasher
+from .utils.sqlite import is_file_sqlite, sqlite_engine_options, install_sqlite_pragmas
+
+def init_migrate(app):
+    """Register Flask-Migrate, which imports alembic, on first use"""
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db, directory=os.path.join(os.path.dirname(app.root_path), 'migrations'), render_as_batch=True)
+
+def upgrade_database(app):
+    """Bring the schema up to date"""
+    init_migrate(app)
+    from flask_migrate import upgrade
+    with app.app_context():
+        upgrade()
 
 def create_app():
     """Application factory pattern"""
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # SQLite production mode: pool options before the engine is created,
+    # pragmas on each connection it opens
+    sqlite_production = (
+        app.config['SQLITE_PRODUCTION_MODE'] and is_file_sqlite(app.config['SQLALCHEMY_DATABASE_URI'])
+    )
+    if sqlite_production:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **sqlite_engine_options(app.config),
+            **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        }
+    
     # Initialize extensions
     db.init_app(app)
-    bcrypt.init_app(app)
+    if sqlite_production:
+        with app.app_context():
+            install_sqlite_pragmas(db.engine, app.config)
+    # Migrations are only needed by the `flask db` commands and schema
+    # upgrades, so serving processes never import alembic
+    if click.get_current_context(silent=True) is not None:
+        init_migrate(app)
+    PasswordHasher(app)
     jwt = JWTManager(app)
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
     
+    QRCodeCache(app)
+    ReportCache(app)
+    if app.config['CHECKIN_COALESCE']:
+        from .utils.checkin_buffer import CheckinBuffer
+        CheckinBuffer(app)
+    
     # Additional JWT claims
     @jwt.additional_claims_loader
     def add_claims_to_jwt(identity):
@@ -33,6 +76,12 @@ def create_app():
     def health_check():
         return jsonify({'status': 'healthy', 'message': 'Application is running'}), 200
     
+    # Per-route latency and SQL metrics at /api/metrics
+    if app.config['METRICS_ENABLED']:
+        from .utils.metrics import RequestMetrics
+        with app.app_context():
+            RequestMetrics(app, db.engine)
+    
     # Register blueprints
     from .routes import auth, users, courses, attendance, reports
     
@@ -42,6 +91,11 @@ def create_app():
     app.register_blueprint(attendance.bp, url_prefix='/api/attendance')
     app.register_blueprint(reports.bp, url_prefix='/api/reports')
     
+    # CLI commands
+    from .commands import search_cli, summary_cli
+    app.cli.add_command(summary_cli)
+    app.cli.add_command(search_cli)
+    
     # Error handlers
     @app.errorhandler(400)
     def bad_request(e):
@@ -63,8 +117,9 @@ def create_app():
     def internal_error(e):
         return jsonify({'error': 'Internal server error', 'message': 'An unexpected error occurred'}), 500
     
-    # Create tables
-    with app.app_context():
-        db.create_all()
+    # Schema upgrades normally run once before serving (run.py, the gunicorn
+    # master, `flask db upgrade`); AUTO_MIGRATE also runs them here
+    if app.config['AUTO_MIGRATE']:
+        upgrade_database(app)
     
     return app
@@ -0,0 +1,39 @@
+import click
+from flask.cli import AppGroup
+from .utils.search import missing_search_objects
+from .utils.summary import rebuild_summary, verify_summary
+
+summary_cli = AppGroup('summary', help='Maintain the attendance summary table.')
+
+@summary_cli.command('rebuild')
+def rebuild_command():
+    """Recompute attendance summaries from raw attendance rows"""
+    count = rebuild_summary()
+    click.echo(f'Rebuilt {count} attendance summary rows')
+    _report_mismatches(verify_summary())
+
+@summary_cli.command('verify')
+def verify_command():
+    """Check attendance summaries against raw attendance rows"""
+    _report_mismatches(verify_summary())
+
+def _report_mismatches(mismatches):
+    if mismatches:
+        for student_id, course_id in mismatches[:20]:
+            click.echo(f'Mismatch: student {student_id}, course {course_id}', err=True)
+        raise click.ClickException(f'{len(mismatches)} attendance summary rows are inconsistent')
+    click.echo('Attendance summaries are consistent')
+
+search_cli = AppGroup('search', help='Maintain the full-text search index.')
+
+@search_cli.command('verify')
+def search_verify_command():
+    """Check that the search index tables and sync triggers exist"""
+    missing = missing_search_objects()
+    if missing:
+        for name in missing:
+            click.echo(f'Missing: {name}', err=True)
+        raise click.ClickException(
+            f'{len(missing)} search index objects are missing; recreate them as in migration 0005'
+        )
+    click.echo('Search index tables and triggers are in place')
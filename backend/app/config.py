@@ -12,9 +12,58 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///attendance.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Also upgrade the schema in every create_app call (off: run.py, the
+    # gunicorn master and `flask db upgrade` upgrade it once before serving)
+    AUTO_MIGRATE = os.getenv('AUTO_MIGRATE', 'false').lower() == 'true'
+    
+    # SQLite production mode (on-disk SQLite only): WAL journal,
+    # synchronous=NORMAL, lock wait, memory-mapped I/O and page cache on
+    # every connection, a pool sized for the server threads and a periodic
+    # PRAGMA optimize (0 disables it)
+    SQLITE_PRODUCTION_MODE = os.getenv('SQLITE_PRODUCTION_MODE', 'true').lower() == 'true'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536'))
+    SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', '10'))
+    SQLITE_POOL_OVERFLOW = int(os.getenv('SQLITE_POOL_OVERFLOW', '10'))
+    SQLITE_OPTIMIZE_INTERVAL = int(os.getenv('SQLITE_OPTIMIZE_INTERVAL', '3600'))
+    
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGIN', 'http://localhost:3000').split(',')
     
     # JWT
     JWT_TOKEN_LOCATION = ['headers']
-    JWT_ACCESS_TOKEN_EXPIRES = 86400  # 24 hours
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = 86400  # 24 hours
+    
+    # Password hashing: bcrypt cost for new hashes (older hashes are
+    # upgraded on login)
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+    
+    # QR check-in write coalescing: buffer check-ins and commit them in
+    # batches every CHECKIN_FLUSH_INTERVAL seconds or CHECKIN_BATCH_SIZE rows
+    CHECKIN_COALESCE = os.getenv('CHECKIN_COALESCE', 'false').lower() == 'true'
+    CHECKIN_BATCH_SIZE = int(os.getenv('CHECKIN_BATCH_SIZE', '200'))
+    CHECKIN_FLUSH_INTERVAL = float(os.getenv('CHECKIN_FLUSH_INTERVAL', '0.1'))
+    CHECKIN_ACK_TIMEOUT = float(os.getenv('CHECKIN_ACK_TIMEOUT', '5'))
+    
+    # Check-in QR codes: token rotation window, how long a token stays
+    # valid after its window opens, and rendered image cache size
+    QR_ROTATION_SECONDS = int(os.getenv('QR_ROTATION_SECONDS', '30'))
+    CHECKIN_TOKEN_TTL = int(os.getenv('CHECKIN_TOKEN_TTL', '600'))
+    QR_CACHE_SIZE = int(os.getenv('QR_CACHE_SIZE', '256'))
+    
+    # Request metrics served at /api/metrics (Prometheus text format; off
+    # by default, and only served to scrapers sending METRICS_TOKEN as a
+    # bearer token when it is set), and a warning log with the SQL of
+    # requests slower than SLOW_REQUEST_MS (0 disables the slow-request log)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '0'))
+    
+    # Report response cache: 'memory' (per process), 'redis' (shared by all
+    # workers at REPORT_CACHE_URL; needs the redis package) or 'none'.
+    # Entries are versioned per course, so the TTL only bounds their lifetime
+    REPORT_CACHE_BACKEND = os.getenv('REPORT_CACHE_BACKEND', 'memory')
+    REPORT_CACHE_URL = os.getenv('REPORT_CACHE_URL', 'redis://localhost:6379/0')
+    REPORT_CACHE_SIZE = int(os.getenv('REPORT_CACHE_SIZE', '512'))
+    REPORT_CACHE_TTL = int(os.getenv('REPORT_CACHE_TTL', '300'))
@@ -1,9 +1,8 @@
 from datetime import datetime
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
 
 db = SQLAlchemy()
-bcrypt = Bcrypt()
 
 class User(db.Model):
     """User model for admin, teacher, and student roles"""
@@ -23,11 +22,15 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = current_app.extensions['password_hasher'].hash(password)
     
     def check_password(self, password):
         """Verify password"""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return current_app.extensions['password_hasher'].check(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Whether the stored hash uses a different bcrypt cost than configured"""
+        return current_app.extensions['password_hasher'].needs_rehash(self.password_hash)
     
     def to_dict(self):
         """Serialize user to dictionary (exclude password)"""
@@ -52,15 +55,27 @@ class Course(db.Model):
     semester = db.Column(db.String(20))  # Fall, Spring, Summer
     year = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by writes that change this course's reports (see utils/report_cache.py)
+    report_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     enrollments = db.relationship('Enrollment', backref='course', lazy=True, cascade='all, delete-orphan')
     attendance_records = db.relationship('Attendance', backref='course', lazy=True, cascade='all, delete-orphan')
-    
-    __table_args__ = (db.UniqueConstraint('code', 'semester', 'year', name='_course_semester_uc'),)
-    
-    def to_dict(self, include_students=False):
-        """Serialize course to dictionary"""
+    attendance_summaries = db.relationship('AttendanceSummary', lazy=True, cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        db.UniqueConstraint('code', 'semester', 'year', name='_course_semester_uc'),
+        db.Index('ix_courses_teacher_id', 'teacher_id'),
+    )
+    
+    def to_dict(self, include_students=False, enrolled_count=None):
+        """Serialize course to dictionary
+        
+        Pass a precomputed ``enrolled_count`` to avoid loading every
+        enrollment just to count them.
+        """
+        if enrolled_count is None:
+            enrolled_count = len(self.enrollments)
         data = {
             'id': self.id,
             'name': self.name,
@@ -71,7 +86,7 @@ class Course(db.Model):
             'semester': self.semester,
             'year': self.year,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'enrolled_count': len(self.enrollments)
+            'enrolled_count': enrolled_count
         }
         if include_students:
             data['students'] = [e.student.to_dict() for e in self.enrollments]
@@ -87,7 +102,10 @@ class Enrollment(db.Model):
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False)
     enrolled_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    __table_args__ = (db.UniqueConstraint('student_id', 'course_id', name='_student_course_uc'),)
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'course_id', name='_student_course_uc'),
+        db.Index('ix_enrollments_course_id', 'course_id'),
+    )
     
     def to_dict(self):
         return {
@@ -115,7 +133,13 @@ class Attendance(db.Model):
     # Relationship to who marked the attendance
     marker = db.relationship('User', foreign_keys=[marked_by])
     
-    __table_args__ = (db.UniqueConstraint('student_id', 'course_id', 'date', name='_student_course_date_uc'),)
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'course_id', 'date', name='_student_course_date_uc'),
+        # Course listings, exports and reports filter by course and order by date
+        db.Index('ix_attendance_course_date_status', 'course_id', 'date', 'status'),
+        # Student history pages filter by student and order by date
+        db.Index('ix_attendance_student_date', 'student_id', 'date'),
+    )
     
     def to_dict(self):
         return {
@@ -129,4 +153,24 @@ class Attendance(db.Model):
             'notes': self.notes,
             'marked_by': self.marked_by,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        }
\ No newline at end of file
+        }
+
+
+class AttendanceSummary(db.Model):
+    """Per student and course attendance counts
+    
+    Maintained in the same transaction as every Attendance write (see
+    ``app.utils.summary``) so reports can read one row per student instead
+    of scanning attendance history.
+    """
+    __tablename__ = 'attendance_summary'
+    
+    student_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), primary_key=True)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    excused = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (db.Index('ix_attendance_summary_course_id', 'course_id'),)
@@ -1,12 +1,21 @@
-from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, decode_token
+from flask import Blueprint, current_app, request
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from sqlalchemy import func
 from datetime import datetime, date
 from ..models import db, Attendance, Course, Enrollment, User
-from ..utils.helpers import success_response, error_response, paginate, parse_date
+from ..utils.helpers import success_response, error_response, paginate, parse_date, is_course_teacher
 from ..utils.decorators import teacher_or_admin_required
+from ..utils.bulk import chunked, key_in, upsert
+from ..utils.summary import lock_enrollments, record_status_changes
+from ..utils.serializers import attendance_listing_query, serialize_attendance_rows
+from ..utils.checkin_buffer import CheckinTimeout
+from ..utils.checkin_token import verify_checkin_token
 
 bp = Blueprint('attendance', __name__)
 
+VALID_STATUSES = ['present', 'absent', 'late', 'excused']
+BULK_CHUNK_SIZE = 500
+
 @bp.route('', methods=['POST'])
 @jwt_required()
 @teacher_or_admin_required
@@ -22,19 +31,19 @@ def mark_attendance():
             return error_response(f'{field} is required', 400)
     
     # Validate status
-    valid_statuses = ['present', 'absent', 'late', 'excused']
-    if data['status'] not in valid_statuses:
-        return error_response(f'Invalid status. Must be one of: {", ".join(valid_statuses)}', 400)
+    if data['status'] not in VALID_STATUSES:
+        return error_response(f'Invalid status. Must be one of: {", ".join(VALID_STATUSES)}', 400)
     
     # Parse date
     attendance_date = parse_date(data['date'])
     if not attendance_date:        return error_response('Invalid date format', 400)
     
-    # Check if student is enrolled
+    # Check if student is enrolled, locking the enrollment so concurrent
+    # writes cannot read the same old status
     enrollment = Enrollment.query.filter_by(
         student_id=data['student_id'],
         course_id=data['course_id']
-    ).first()
+    ).with_for_update().first()
     
     if not enrollment:
         return error_response('Student not enrolled in this course', 400)
@@ -48,6 +57,7 @@ def mark_attendance():
     
     if existing:
         # Update existing
+        old_status = existing.status
         existing.status = data['status']
         existing.notes = data.get('notes')
         existing.marked_by = user_id
@@ -64,8 +74,10 @@ def mark_attendance():
             check_in_time=datetime.utcnow() if data['status'] in ['present', 'late'] else None
         )
         db.session.add(attendance)
+        old_status = None
     
     try:
+        record_status_changes([(data['student_id'], data['course_id'], old_status, data['status'])])
         db.session.commit()
         return success_response(
             existing.to_dict() if existing else attendance.to_dict(),
@@ -85,53 +97,97 @@ def bulk_mark_attendance():
     user_id = get_jwt_identity()
     
     records = data.get('records', [])
-    if not records:
+    if not records or not isinstance(records, list):
         return error_response('records array is required', 400)
     
+    # Validate every record before touching the database
+    valid = []
+    errors = []
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors.append({'index': index, 'record': record, 'error': 'Record must be an object'})
+            continue
+        missing = [field for field in ('student_id', 'course_id', 'date', 'status') if field not in record]
+        if missing:
+            errors.append({'index': index, 'record': record, 'error': f'{missing[0]} is required'})
+            continue
+        if record['status'] not in VALID_STATUSES:
+            errors.append({'index': index, 'record': record, 'error': f'Invalid status. Must be one of: {", ".join(VALID_STATUSES)}'})
+            continue
+        attendance_date = parse_date(record.get('date'))
+        if not attendance_date:
+            errors.append({'index': index, 'record': record, 'error': 'Invalid date'})
+            continue
+        try:
+            key = (int(record['student_id']), int(record['course_id']), attendance_date)
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'record': record, 'error': 'student_id and course_id must be integers'})
+            continue
+        valid.append((index, key, record))
+    
+    # Prefetch (and lock) enrollments and existing rows with one IN query
+    # per chunk
+    enrolled = lock_enrollments((key[:2] for _, key, _ in valid), BULK_CHUNK_SIZE)
+    
+    keys = list({key for _, key, _ in valid if key[:2] in enrolled})
+    existing = {}
+    for chunk in chunked(keys, BULK_CHUNK_SIZE):
+        existing.update(
+            ((student_id, course_id, attendance_date), status)
+            for student_id, course_id, attendance_date, status in db.session.query(
+                Attendance.student_id, Attendance.course_id, Attendance.date, Attendance.status
+            ).filter(
+                key_in((Attendance.student_id, Attendance.course_id, Attendance.date), chunk)
+            )
+        )
+    
     created = 0
     updated = 0
-    errors = []    
-    for record in records:
-        try:
-            attendance_date = parse_date(record.get('date'))
-            if not attendance_date:
-                errors.append({'record': record, 'error': 'Invalid date'})
-                continue
-            
-            existing = Attendance.query.filter_by(
-                student_id=record['student_id'],
-                course_id=record['course_id'],
-                date=attendance_date
-            ).first()
-            
-            if existing:
-                existing.status = record['status']
-                existing.notes = record.get('notes')
-                existing.marked_by = user_id
-                if record['status'] in ['present', 'late'] and not existing.check_in_time:
-                    existing.check_in_time = datetime.utcnow()
-                updated += 1
-            else:
-                attendance = Attendance(
-                    student_id=record['student_id'],
-                    course_id=record['course_id'],
-                    date=attendance_date,
-                    status=record['status'],
-                    notes=record.get('notes'),
-                    marked_by=user_id,
-                    check_in_time=datetime.utcnow() if record['status'] in ['present', 'late'] else None
-                )
-                db.session.add(attendance)
-                created += 1
-        except Exception as e:
-            errors.append({'record': record, 'error': str(e)})
+    now = datetime.utcnow()
+    rows = {}
+    for index, key, record in valid:
+        if key[:2] not in enrolled:
+            errors.append({'index': index, 'record': record, 'error': 'Student not enrolled in this course'})
+            continue
+        if key in existing or key in rows:
+            updated += 1
+        else:
+            created += 1
+        # Later records for the same student/course/date win
+        rows[key] = {
+            'student_id': key[0],
+            'course_id': key[1],
+            'date': key[2],
+            'status': record['status'],
+            'notes': record.get('notes'),
+            'marked_by': user_id,
+            'check_in_time': now if record['status'] in ['present', 'late'] else None
+        }
     
     try:
+        upsert(
+            db.session,
+            Attendance.__table__,
+            list(rows.values()),
+            index_elements=['student_id', 'course_id', 'date'],
+            set_=lambda excluded: {
+                'status': excluded.status,
+                'notes': excluded.notes,
+                'marked_by': excluded.marked_by,
+                # Keep the first check-in time, as single updates do
+                'check_in_time': func.coalesce(Attendance.__table__.c.check_in_time, excluded.check_in_time)
+            },
+            chunk_size=BULK_CHUNK_SIZE
+        )
+        record_status_changes(
+            (key[0], key[1], existing.get(key), row['status'])
+            for key, row in rows.items()
+        )
         db.session.commit()
         return success_response({
             'created': created,
             'updated': updated,
-            'errors': errors
+            'errors': sorted(errors, key=lambda error: error['index'])
         }, f'Processed {created + updated} attendance records')
     except Exception as e:
         db.session.rollback()
@@ -148,28 +204,36 @@ def checkin():
         return error_response('Token is required', 400)
     
     try:
-        # Decode and verify token
-        decoded = decode_token(token)
-        claims = decoded.get('sub')
-        scope = decoded.get('scope')
-        course_id = decoded.get('course_id')
-        if scope != 'checkin' or not course_id:
+        # Verify the signed check-in token from the course QR code
+        course_id = verify_checkin_token(token)
+        if not course_id:
             return error_response('Invalid check-in token', 400)
         
         # Get current user (student)
         student_id = get_jwt_identity()
         
-        # Verify enrollment
+        # Verify enrollment; the direct write below keeps it locked
         enrollment = Enrollment.query.filter_by(
             student_id=student_id,
             course_id=course_id
-        ).first()
+        ).with_for_update().first()
         
         if not enrollment:
             return error_response('You are not enrolled in this course', 403)
         
         # Mark attendance
         today = date.today()
+        
+        if current_app.config['CHECKIN_COALESCE']:
+            # Hand off to the batching writer and wait for its commit; the
+            # read transaction is closed first so it cannot block the write
+            db.session.close()
+            try:
+                record = current_app.extensions['checkin_buffer'].submit(student_id, course_id, today)
+            except CheckinTimeout:
+                return error_response('Check-in is busy, please try again', 503)
+            return success_response(record, 'Check-in successful')
+        
         existing = Attendance.query.filter_by(
             student_id=student_id,
             course_id=course_id,
@@ -177,6 +241,7 @@ def checkin():
         ).first()
         
         if existing:
+            old_status = existing.status
             existing.status = 'present'
             existing.check_in_time = datetime.utcnow()
         else:
@@ -187,7 +252,9 @@ def checkin():
                 status='present',                check_in_time=datetime.utcnow()
             )
             db.session.add(attendance)
+            old_status = None
         
+        record_status_changes([(student_id, course_id, old_status, 'present')])
         db.session.commit()
         return success_response(
             existing.to_dict() if existing else attendance.to_dict(),
@@ -208,7 +275,7 @@ def get_course_attendance(course_id):
     course = Course.query.get_or_404(course_id)
     
     # Check permissions
-    if role == 'teacher' and course.teacher_id != user_id:
+    if role == 'teacher' and not is_course_teacher(course, user_id):
         return error_response('Access denied', 403)
     elif role == 'student':
         return error_response('Access denied', 403)
@@ -220,16 +287,25 @@ def get_course_attendance(course_id):
     end_date = request.args.get('end_date')
     status = request.args.get('status')
     
-    query = Attendance.query.filter_by(course_id=course_id)
+    query = attendance_listing_query().filter(Attendance.course_id == course_id)
     
     if start_date:
         query = query.filter(Attendance.date >= parse_date(start_date))
     if end_date:
         query = query.filter(Attendance.date <= parse_date(end_date))
     if status:
-        query = query.filter_by(status=status)
+        query = query.filter(Attendance.status == status)
     
-    result = paginate(query.order_by(Attendance.date.desc()), page, per_page)
+    try:
+        result = paginate(
+            query.order_by(Attendance.date.desc(), Attendance.id.desc()), page, per_page,
+            cursor=request.args.get('cursor'),
+            keys=(Attendance.date, Attendance.id),
+            include_total=request.args.get('include_total', 0, type=int) == 1,
+            serialize=serialize_attendance_rows
+        )
+    except ValueError as e:
+        return error_response(str(e), 400)
     return success_response(result)
 
 @bp.route('/student/<int:student_id>', methods=['GET'])
@@ -241,18 +317,27 @@ def get_student_attendance(student_id):
     role = claims.get('role')
     
     # Students can only view their own attendance
-    if role == 'student' and user_id != student_id:
+    if role == 'student' and int(user_id) != student_id:
         return error_response('Access denied', 403)
     
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
     course_id = request.args.get('course_id', type=int)
-    query = Attendance.query.filter_by(student_id=student_id)
+    query = attendance_listing_query().filter(Attendance.student_id == student_id)
     
     if course_id:
-        query = query.filter_by(course_id=course_id)
+        query = query.filter(Attendance.course_id == course_id)
     
-    result = paginate(query.order_by(Attendance.date.desc()), page, per_page)
+    try:
+        result = paginate(
+            query.order_by(Attendance.date.desc(), Attendance.id.desc()), page, per_page,
+            cursor=request.args.get('cursor'),
+            keys=(Attendance.date, Attendance.id),
+            include_total=request.args.get('include_total', 0, type=int) == 1,
+            serialize=serialize_attendance_rows
+        )
+    except ValueError as e:
+        return error_response(str(e), 400)
     return success_response(result)
 
 @bp.route('/<int:attendance_id>', methods=['PUT'])
@@ -260,15 +345,19 @@ def get_student_attendance(student_id):
 @teacher_or_admin_required
 def update_attendance(attendance_id):
     """Update attendance record"""
-    attendance = Attendance.query.get_or_404(attendance_id)
+    attendance = Attendance.query.with_for_update().get_or_404(attendance_id)
     data = request.get_json()
+    old_status = attendance.status
     
     if 'status' in data:
+        if data['status'] not in VALID_STATUSES:
+            return error_response(f'Invalid status. Must be one of: {", ".join(VALID_STATUSES)}', 400)
         attendance.status = data['status']
     if 'notes' in data:
         attendance.notes = data['notes']
     
     try:
+        record_status_changes([(attendance.student_id, attendance.course_id, old_status, attendance.status)])
         db.session.commit()
         return success_response(attendance.to_dict(), 'Attendance updated')
     except Exception as e:
@@ -280,9 +369,10 @@ def update_attendance(attendance_id):
 @teacher_or_admin_required
 def delete_attendance(attendance_id):
     """Delete attendance record"""
-    attendance = Attendance.query.get_or_404(attendance_id)
+    attendance = Attendance.query.with_for_update().get_or_404(attendance_id)
     
     try:
+        record_status_changes([(attendance.student_id, attendance.course_id, attendance.status, None)])
         db.session.delete(attendance)
         db.session.commit()
         return success_response(message='Attendance deleted')
@@ -57,6 +57,14 @@ def login():
     if not user or not user.check_password(data["password"]):
         return error_response("Invalid credentials", 401)
 
+    # Transparently upgrade hashes made with a different bcrypt cost
+    if user.password_needs_rehash():
+        user.set_password(data["password"])
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+
     # Create access token
     access_token = create_access_token(identity=str(user.id))
 
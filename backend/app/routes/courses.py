@@ -1,14 +1,22 @@
-from flask import Blueprint, request, send_file
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, create_access_token
-from datetime import datetime, timedelta
-import qrcode
+from flask import Blueprint, Response, current_app, request
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+import time
 from io import BytesIO
 from ..models import db, Course, User, Enrollment
-from ..utils.helpers import success_response, error_response, paginate
+from ..utils.helpers import success_response, error_response, paginate, is_course_teacher
 from ..utils.decorators import teacher_or_admin_required, admin_required
+from ..utils.bulk import chunked, upsert
+from ..utils.serializers import course_load_options, serialize_course, serialize_courses
+from ..utils.checkin_token import create_checkin_token
+from ..utils.report_cache import bump_report_versions
+from ..utils.search import apply_search
 
 bp = Blueprint('courses', __name__)
 
+BULK_CHUNK_SIZE = 500
+
+QR_MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
 @bp.route('', methods=['GET'])
 @jwt_required()
 def get_courses():
@@ -39,12 +47,12 @@ def get_courses():
     if year:
         query = query.filter_by(year=year)
     if search:
-        query = query.filter(
-            (Course.name.ilike(f'%{search}%')) |
-            (Course.code.ilike(f'%{search}%'))
-        )
+        query = apply_search(query, Course, search)
     
-    result = paginate(query.order_by(Course.created_at.desc()), page, per_page)
+    result = paginate(
+        query.options(*course_load_options()).order_by(Course.created_at.desc()), page, per_page,
+        serialize=serialize_courses
+    )
     return success_response(result)
 
 @bp.route('', methods=['POST'])
@@ -88,7 +96,7 @@ def create_course():
     try:
         db.session.add(course)
         db.session.commit()
-        return success_response(course.to_dict(), 'Course created successfully', 201)
+        return success_response(course.to_dict(enrolled_count=0), 'Course created successfully', 201)
     except Exception as e:
         db.session.rollback()
         return error_response('Course creation failed', 500)
@@ -100,17 +108,17 @@ def get_course(course_id):
     claims = get_jwt()
     role = claims.get('role')
     
-    course = Course.query.get_or_404(course_id)
+    course = Course.query.options(*course_load_options(include_students=True)).get_or_404(course_id)
     
     # Check access
     if role == 'student':
         enrollment = Enrollment.query.filter_by(student_id=user_id, course_id=course_id).first()
         if not enrollment:
             return error_response('Access denied', 403)
-    elif role == 'teacher' and course.teacher_id != user_id:
+    elif role == 'teacher' and not is_course_teacher(course, user_id):
         return error_response('Access denied', 403)
     
-    return success_response(course.to_dict(include_students=True))
+    return success_response(serialize_course(course, include_students=True))
 
 @bp.route('/<int:course_id>', methods=['PUT'])
 @jwt_required()
@@ -124,7 +132,7 @@ def update_course(course_id):
     course = Course.query.get_or_404(course_id)
     
     # Check permissions
-    if role == 'teacher' and course.teacher_id != user_id:
+    if role == 'teacher' and not is_course_teacher(course, user_id):
         return error_response('Access denied', 403)
     
     data = request.get_json()
@@ -140,8 +148,9 @@ def update_course(course_id):
         course.year = data['year']
     
     try:
+        bump_report_versions([course_id])
         db.session.commit()
-        return success_response(course.to_dict(), 'Course updated successfully')
+        return success_response(serialize_course(course), 'Course updated successfully')
     except Exception as e:
         db.session.rollback()
         return error_response('Update failed', 500)
@@ -158,7 +167,7 @@ def delete_course(course_id):
     course = Course.query.get_or_404(course_id)
     
     # Check permissions
-    if role == 'teacher' and course.teacher_id != user_id:
+    if role == 'teacher' and not is_course_teacher(course, user_id):
         return error_response('Access denied', 403)
     
     try:
@@ -173,7 +182,11 @@ def delete_course(course_id):
 @jwt_required()
 @teacher_or_admin_required
 def enroll_student(course_id):
-    """Enroll student(s) in course"""
+    """Enroll student(s) in course
+    
+    With ``replace`` set, the given ids become the full roster and any
+    other enrolled students are removed.
+    """
     user_id = get_jwt_identity()
     claims = get_jwt()
     role = claims.get('role')
@@ -181,30 +194,62 @@ def enroll_student(course_id):
     course = Course.query.get_or_404(course_id)
     
     # Check permissions
-    if role == 'teacher' and course.teacher_id != user_id:
+    if role == 'teacher' and not is_course_teacher(course, user_id):
         return error_response('Access denied', 403)
     
     data = request.get_json()
     student_ids = data.get('student_ids', [])
+    replace = bool(data.get('replace', False))
+    
+    if not isinstance(student_ids, list):
+        return error_response('student_ids must be a list of integers', 400)
     
-    if not student_ids:
+    # An empty roster is only meaningful when it replaces the current one
+    if not student_ids and not replace:
         return error_response('student_ids is required', 400)
     
-    enrolled = []
-    for student_id in student_ids:
-        # Check if already enrolled
-        existing = Enrollment.query.filter_by(student_id=student_id, course_id=course_id).first()
-        if not existing:
-            enrollment = Enrollment(student_id=student_id, course_id=course_id)
-            db.session.add(enrollment)
-            enrolled.append(student_id)
+    try:
+        # Deduplicate while keeping the order the roster was sent in
+        student_ids = list(dict.fromkeys(int(student_id) for student_id in student_ids))
+    except (TypeError, ValueError):
+        return error_response('student_ids must be a list of integers', 400)
+    
+    # Only existing users with the student role can be enrolled
+    valid_ids = set()
+    for chunk in chunked(student_ids, BULK_CHUNK_SIZE):
+        valid_ids.update(student_id for student_id, in db.session.query(User.id).filter(
+            User.id.in_(chunk),
+            User.role == 'student'
+        ))
+    invalid_ids = [student_id for student_id in student_ids if student_id not in valid_ids]
+    
+    current_ids = {student_id for student_id, in db.session.query(Enrollment.student_id).filter_by(course_id=course_id)}
+    enrolled = [student_id for student_id in student_ids if student_id in valid_ids and student_id not in current_ids]
+    removed = sorted(current_ids - valid_ids) if replace else []
     
     try:
-        db.session.commit()
-        return success_response(
-            {'enrolled_count': len(enrolled), 'student_ids': enrolled},
-            f'{len(enrolled)} student(s) enrolled successfully'
+        upsert(
+            db.session,
+            Enrollment.__table__,
+            [{'student_id': student_id, 'course_id': course_id} for student_id in enrolled],
+            index_elements=['student_id', 'course_id'],
+            chunk_size=BULK_CHUNK_SIZE
         )
+        for chunk in chunked(removed, BULK_CHUNK_SIZE):
+            Enrollment.query.filter(
+                Enrollment.course_id == course_id,
+                Enrollment.student_id.in_(chunk)
+            ).delete(synchronize_session=False)
+        if enrolled or removed:
+            bump_report_versions([course_id])
+        db.session.commit()
+        
+        result = {'enrolled_count': len(enrolled), 'student_ids': enrolled, 'invalid_ids': invalid_ids}
+        message = f'{len(enrolled)} student(s) enrolled successfully'
+        if replace:
+            result.update({'removed_count': len(removed), 'removed_ids': removed})
+            message += f', {len(removed)} removed'
+        return success_response(result, message)
     except Exception as e:
         db.session.rollback()
         return error_response('Enrollment failed', 500)
@@ -220,7 +265,7 @@ def unenroll_student(course_id, student_id):
     course = Course.query.get_or_404(course_id)
     
     # Check permissions
-    if role == 'teacher' and course.teacher_id != user_id:
+    if role == 'teacher' and not is_course_teacher(course, user_id):
         return error_response('Access denied', 403)
     
     enrollment = Enrollment.query.filter_by(student_id=student_id, course_id=course_id).first()
@@ -229,6 +274,7 @@ def unenroll_student(course_id, student_id):
     
     try:
         db.session.delete(enrollment)
+        bump_report_versions([course_id])
         db.session.commit()
         return success_response(message='Student removed from course')
     except Exception as e:
@@ -246,7 +292,7 @@ def get_course_students(course_id):
     course = Course.query.get_or_404(course_id)
     
     # Check access
-    if role == 'teacher' and course.teacher_id != user_id:
+    if role == 'teacher' and not is_course_teacher(course, user_id):
         return error_response('Access denied', 403)
     elif role == 'student':
         enrollment = Enrollment.query.filter_by(student_id=user_id, course_id=course_id).first()
@@ -260,10 +306,7 @@ def get_course_students(course_id):
     query = User.query.join(Enrollment).filter(Enrollment.course_id == course_id)
     
     if search:
-        query = query.filter(
-            (User.username.ilike(f'%{search}%')) |
-            (User.email.ilike(f'%{search}%'))
-        )
+        query = apply_search(query, User, search)
     
     result = paginate(query.order_by(User.username), page, per_page)
     return success_response(result)
@@ -280,26 +323,45 @@ def generate_qr_code(course_id):
     course = Course.query.get_or_404(course_id)
     
     # Check permissions
-    if role == 'teacher' and course.teacher_id != user_id:        return error_response('Access denied', 403)
-    
-    # Generate short-lived JWT token for check-in
-    token = create_access_token(
-        identity=user_id,
-        additional_claims={
-            'scope': 'checkin',
-            'course_id': course_id
-        },
-        expires_delta=timedelta(minutes=10)
+    if role == 'teacher' and not is_course_teacher(course, user_id):
+        return error_response('Access denied', 403)
+    
+    format_type = request.args.get('format', 'png').lower()
+    if format_type not in QR_MIMETYPES:
+        return error_response('Invalid format. Use png or svg', 400)
+    
+    # Tokens rotate every QR_ROTATION_SECONDS; all polls within a window
+    # share one token and one rendered image
+    rotation = current_app.config['QR_ROTATION_SECONDS']
+    now = time.time()
+    window = int(now // rotation)
+    
+    image = current_app.extensions['qr_cache'].get_or_create(
+        (course_id, format_type),
+        window,
+        lambda: _render_qr_code(create_checkin_token(course_id, window), format_type)
     )
     
-    # Generate QR code
+    response = Response(image, mimetype=QR_MIMETYPES[format_type])
+    response.set_etag(f'qr-{course_id}-{window}-{format_type}')
+    response.cache_control.private = True
+    response.cache_control.max_age = max(1, int((window + 1) * rotation - now))
+    return response.make_conditional(request)
+
+def _render_qr_code(data, format_type):
+    """Render a QR code as PNG or SVG bytes"""
+    # qrcode (and Pillow for PNG) are imported on the first render only
+    import qrcode
+    from qrcode.image.svg import SvgPathImage
+    
     qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(token)
+    qr.add_data(data)
     qr.make(fit=True)
     
-    img = qr.make_image(fill_color="black", back_color="white")
-    img_io = BytesIO()
-    img.save(img_io, 'PNG')
-    img_io.seek(0)
-    
-    return send_file(img_io, mimetype='image/png')
\ No newline at end of file
+    output = BytesIO()
+    if format_type == 'svg':
+        # Vector output skips raster encoding entirely
+        qr.make_image(image_factory=SvgPathImage).save(output)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(output, 'PNG')
+    return output.getvalue()
@@ -1,15 +1,53 @@
-from flask import Blueprint, request, send_file
+from flask import Blueprint, Response, current_app, request, send_file, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from sqlalchemy import func
-from datetime import datetime
+from sqlalchemy import func, and_, case, or_, select
+from datetime import date, datetime, timedelta
 import csv
-import openpyxl
-from io import BytesIO, StringIO
-from ..models import db, Attendance, Course, User, Enrollment
-from ..utils.helpers import success_response, error_response, parse_date
+import unicodedata
+from io import StringIO
+from urllib.parse import quote
+from tempfile import SpooledTemporaryFile
+from ..models import db, Attendance, AttendanceSummary, Course, User, Enrollment
+from ..utils.helpers import success_response, error_response, parse_date, is_course_teacher
+from ..utils.decorators import teacher_or_admin_required
+from ..utils.summary import STATUSES, status_count_columns, summary_columns
+from ..utils.serializers import course_load_options, serialize_courses
+from ..utils.report_cache import cache_key, versions_digest
+from ..utils.timeseries import LOOKBACK_DAYS, attendance_timeseries
 
 bp = Blueprint('reports', __name__)
 
+EXPORT_HEADERS = ['Student Name', 'Student Email', 'Date', 'Status', 'Check-in Time', 'Notes']
+EXPORT_BATCH_SIZE = 1000
+EXPORT_SPOOL_SIZE = 8 * 1024 * 1024
+
+# At-risk defaults: consecutive absences, sessions per trailing window and
+# the fall in attendance rate (percentage points) that flag a student
+AT_RISK_STREAK = 3
+AT_RISK_WINDOW = 10
+AT_RISK_DROP = 20
+# Ranking reads 2 * window sessions of every matching enrollment: a
+# semester takes seconds on a large history, so admins must name a course
+# or a semester and year, and the window is capped
+AT_RISK_MAX_WINDOW = 20
+
+# First versions accepting AS MATERIALIZED on a CTE (MySQL/MariaDB never do)
+MATERIALIZED_CTE_VERSIONS = {'sqlite': (3, 35), 'postgresql': (12,)}
+
+def _summarize(row):
+    """Build the per-status summary dict from an aggregated row"""
+    total = row.total
+    attendance_rate = ((row.present + row.late) / total * 100) if total > 0 else 0
+    
+    return {
+        'total_sessions': total,
+        'present': row.present,
+        'late': row.late,
+        'absent': row.absent,
+        'excused': row.excused,
+        'attendance_rate': round(attendance_rate, 2)
+    }
+
 @bp.route('/course/<int:course_id>', methods=['GET'])
 @jwt_required()
 def get_course_report(course_id):
@@ -21,54 +59,127 @@ def get_course_report(course_id):
     course = Course.query.get_or_404(course_id)
     
     # Check permissions
-    if role == 'teacher' and course.teacher_id != user_id:
+    if role == 'teacher' and not is_course_teacher(course, user_id):
         return error_response('Access denied', 403)
     elif role == 'student':
         return error_response('Access denied', 403)
     
     # Date filters
     start_date = parse_date(request.args.get('start_date')) if request.args.get('start_date') else None
-    end_date = parse_date(request.args.get('end_date')) if request.args.get('end_date') else None    
-    query = Attendance.query.filter_by(course_id=course_id)
+    end_date = parse_date(request.args.get('end_date')) if request.args.get('end_date') else None
+    
+    # The version is read before the report data, so a concurrent write can
+    # only make a cached report newer than its key, never older
+    return current_app.extensions['report_cache'].respond(
+        cache_key('course', course_id, start_date, end_date, course.report_version),
+        lambda: _course_report(course, start_date, end_date)
+    )
+
+def _course_report(course, start_date, end_date):
+    """Build the course report response"""
+    course_id = course.id
+    date_filters = []
     if start_date:
-        query = query.filter(Attendance.date >= start_date)
+        date_filters.append(Attendance.date >= start_date)
     if end_date:
-        query = query.filter(Attendance.date <= end_date)
+        date_filters.append(Attendance.date <= end_date)
     
-    # Status distribution
-    status_counts = db.session.query(
-        Attendance.status,
-        func.count(Attendance.id)
-    ).filter_by(course_id=course_id).group_by(Attendance.status).all()
-    
-    # Per-student summary
-    students = User.query.join(Enrollment).filter(Enrollment.course_id == course_id).all()
-    student_summaries = []
-    
-    for student in students:
-        student_query = query.filter_by(student_id=student.id)
-        total = student_query.count()
-        present = student_query.filter_by(status='present').count()
-        late = student_query.filter_by(status='late').count()
-        absent = student_query.filter_by(status='absent').count()
-        excused = student_query.filter_by(status='excused').count()
+    if date_filters:
+        # Date ranges need the raw history
+        status_counts = db.session.query(
+            Attendance.status,
+            func.count(Attendance.id)
+        ).filter(Attendance.course_id == course_id, *date_filters).group_by(Attendance.status).all()
         
-        attendance_rate = ((present + late) / total * 100) if total > 0 else 0
+        # Per-student summary in a single grouped query; the outer join keeps
+        # enrolled students who have no attendance rows yet
+        rows = db.session.query(User, *status_count_columns()).join(
+            Enrollment, Enrollment.student_id == User.id
+        ).outerjoin(
+            Attendance,
+            and_(
+                Attendance.student_id == Enrollment.student_id,
+                Attendance.course_id == Enrollment.course_id,
+                *date_filters
+            )
+        ).filter(
+            Enrollment.course_id == course_id
+        ).group_by(User.id, Enrollment.id).order_by(Enrollment.id).all()
+    else:
+        # All-time figures come straight from the maintained summary table
+        totals = db.session.query(
+            *[func.coalesce(func.sum(getattr(AttendanceSummary, status)), 0) for status in STATUSES]
+        ).filter(AttendanceSummary.course_id == course_id).one()
+        status_counts = [(status, count) for status, count in zip(STATUSES, totals) if count]
         
-        student_summaries.append({
-            'student': student.to_dict(),
-            'total_sessions': total,
-            'present': present,
-            'late': late,            'absent': absent,
-            'excused': excused,
-            'attendance_rate': round(attendance_rate, 2)
-        })
+        rows = db.session.query(User, *summary_columns()).join(
+            Enrollment, Enrollment.student_id == User.id
+        ).outerjoin(
+            AttendanceSummary,
+            and_(
+                AttendanceSummary.student_id == Enrollment.student_id,
+                AttendanceSummary.course_id == Enrollment.course_id
+            )
+        ).filter(
+            Enrollment.course_id == course_id
+        ).order_by(Enrollment.id).all()
+    
+    student_summaries = [
+        {'student': row.User.to_dict(), **_summarize(row)}
+        for row in rows
+    ]
     
     return success_response({
-        'course': course.to_dict(),
+        # Every enrolled student has a row, so the roster size is already known
+        'course': course.to_dict(enrolled_count=len(student_summaries)),
         'status_distribution': dict(status_counts),
         'students': student_summaries,
-        'total_students': len(students)
+        'total_students': len(student_summaries)
+    })
+
+@bp.route('/course/<int:course_id>/timeseries', methods=['GET'])
+@jwt_required()
+def get_course_timeseries(course_id):
+    """Get daily attendance rates and trends for a course"""
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+    role = claims.get('role')
+    
+    course = Course.query.get_or_404(course_id)
+    
+    # Check permissions
+    if role == 'teacher' and not is_course_teacher(course, user_id):
+        return error_response('Access denied', 403)
+    elif role == 'student':
+        return error_response('Access denied', 403)
+    
+    start_date = parse_date(request.args.get('start_date')) if request.args.get('start_date') else None
+    end_date = parse_date(request.args.get('end_date')) if request.args.get('end_date') else None
+    
+    return current_app.extensions['report_cache'].respond(
+        cache_key('timeseries', course_id, start_date, end_date, course.report_version),
+        lambda: _course_timeseries(course, start_date, end_date)
+    )
+
+def _course_timeseries(course, start_date, end_date):
+    """Build the course time-series response"""
+    filters = [Attendance.course_id == course.id]
+    if start_date:
+        # Rolling windows at the start of the range read earlier sessions
+        filters.append(Attendance.date >= start_date - timedelta(days=LOOKBACK_DAYS))
+    if end_date:
+        filters.append(Attendance.date <= end_date)
+    
+    # One pass over the (course_id, date, status) index
+    counts = db.session.query(
+        Attendance.date,
+        Attendance.status,
+        func.count()
+    ).filter(*filters).group_by(Attendance.date, Attendance.status).all()
+    
+    return success_response({
+        'course_id': course.id,
+        **attendance_timeseries(counts, start_date, end_date)
     })
 
 @bp.route('/student/<int:student_id>', methods=['GET'])
@@ -80,42 +191,264 @@ def get_student_report(student_id):
     role = claims.get('role')
     
     # Students can only view their own reports
-    if role == 'student' and user_id != student_id:
+    if role == 'student' and int(user_id) != student_id:
         return error_response('Access denied', 403)
     
     student = User.query.get_or_404(student_id)
     
-    # Get courses
-    enrollments = Enrollment.query.filter_by(student_id=student_id).all()
-    course_reports = []
+    # The report changes whenever any of the student's courses does
+    versions = db.session.query(Course.id, Course.report_version).join(
+        Enrollment, Enrollment.course_id == Course.id
+    ).filter(Enrollment.student_id == student_id).all()
     
-    for enrollment in enrollments:
-        course = enrollment.course
-        query = Attendance.query.filter_by(student_id=student_id, course_id=course.id)
-        
-        total = query.count()
-        present = query.filter_by(status='present').count()
-        late = query.filter_by(status='late').count()
-        absent = query.filter_by(status='absent').count()
-        excused = query.filter_by(status='excused').count()
-        
-        attendance_rate = ((present + late) / total * 100) if total > 0 else 0
-        
-        course_reports.append({
-            'course': course.to_dict(),
-            'total_sessions': total,
-            'present': present,
-            'late': late,
-            'absent': absent,
-            'excused': excused,
-            'attendance_rate': round(attendance_rate, 2)
-        })
+    return current_app.extensions['report_cache'].respond(
+        cache_key('student', student_id, versions_digest(versions)),
+        lambda: _student_report(student)
+    )
+
+def _student_report(student):
+    """Build the student report response"""
+    student_id = student.id
+    
+    # Per-course counts from the summary table; teachers and enrollment
+    # counts are fetched in batched queries instead of lazily per course
+    rows = db.session.query(Course, *summary_columns()).join(
+        Enrollment, Enrollment.course_id == Course.id
+    ).outerjoin(
+        AttendanceSummary,
+        and_(
+            AttendanceSummary.course_id == Enrollment.course_id,
+            AttendanceSummary.student_id == Enrollment.student_id
+        )
+    ).filter(
+        Enrollment.student_id == student_id
+    ).options(
+        *course_load_options()
+    ).order_by(Enrollment.id).all()
+    
+    courses = serialize_courses([row.Course for row in rows])
+    course_reports = [
+        {'course': course, **_summarize(row)}
+        for course, row in zip(courses, rows)
+    ]
     
     return success_response({
         'student': student.to_dict(),
         'courses': course_reports
     })
 
+@bp.route('/at-risk', methods=['GET'])
+@jwt_required()
+@teacher_or_admin_required
+def get_at_risk_students():
+    """List students with an ongoing absence streak or a falling attendance rate
+    
+    Each enrollment is flagged when its most recent ``streak`` sessions
+    were all absences, or when the rate over its last ``window`` sessions
+    is at least ``drop`` points below the ``window`` sessions before.
+    Teachers only see their own courses; admins must pass ``course_id``,
+    or ``semester`` and ``year``.
+    """
+    user_id = get_jwt_identity()
+    claims = get_jwt()
+    role = claims.get('role')
+    
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    streak = request.args.get('streak', AT_RISK_STREAK, type=int)
+    window = request.args.get('window', AT_RISK_WINDOW, type=int)
+    drop = request.args.get('drop', AT_RISK_DROP, type=float)
+    
+    if not 1 <= window <= AT_RISK_MAX_WINDOW or not 1 <= streak <= 2 * window:
+        return error_response(
+            f'window must be between 1 and {AT_RISK_MAX_WINDOW} and streak between 1 and 2 * window', 400
+        )
+    if role != 'teacher' and not (
+        request.args.get('course_id') or (request.args.get('semester') and request.args.get('year'))
+    ):
+        return error_response('course_id, or semester and year, is required', 400)
+    
+    course_filters = []
+    if request.args.get('course_id'):
+        course_filters.append(Course.id == request.args.get('course_id', type=int))
+    if request.args.get('semester'):
+        course_filters.append(Course.semester == request.args.get('semester'))
+    if request.args.get('year'):
+        course_filters.append(Course.year == request.args.get('year', type=int))
+    if role == 'teacher':
+        course_filters.append(Course.teacher_id == int(user_id))
+    
+    # Any write to one of the matching courses changes the result. The
+    # ranked list is computed once per version and shared by every page
+    versions = db.session.query(Course.id, Course.report_version).filter(*course_filters).all()
+    rows_key = cache_key(
+        'at-risk', request.args.get('course_id'), request.args.get('semester'), request.args.get('year'),
+        streak, window, drop, versions_digest(versions)
+    )
+    report_cache = current_app.extensions['report_cache']
+    
+    return report_cache.respond(
+        cache_key(rows_key, page, per_page),
+        lambda: success_response(_at_risk_page(
+            report_cache.fetch(rows_key, lambda: _at_risk_rows(course_filters, streak, window, drop)),
+            page,
+            per_page
+        ))
+    )
+
+def _at_risk_rows(course_filters, streak, window, drop):
+    """Flagged enrollments, worst first, in one set-based pass
+    
+    Only the last ``2 * window`` session dates of each course are read,
+    through the (course_id, date, status) index. Within each enrollment
+    the sessions are numbered newest first, and a running count of
+    non-absences splits them into islands (gaps-and-islands): island 0 is
+    the current absence streak. The same pass totals attendance over the
+    trailing window and the window before it.
+    
+    Returns ``[student_id, course_id, absence_streak, recent_rate,
+    prior_rate, rate_change]`` lists.
+    """
+    # Oldest session date still inside the two windows, per course.
+    # Materialized where supported so it runs once per course rather than
+    # once per row
+    since = select(Attendance.date).where(
+        Attendance.course_id == Course.id
+    ).distinct().order_by(Attendance.date.desc()).limit(1).offset(2 * window - 1).scalar_subquery()
+    cutoffs = select(
+        Course.id.label('course_id'),
+        func.coalesce(since, date.min).label('since')
+    ).where(*course_filters).cte('cutoffs')
+    if _supports_materialized_cte():
+        cutoffs = cutoffs.prefix_with('MATERIALIZED')
+    
+    enrollment = (Attendance.student_id, Attendance.course_id)
+    recent = select(
+        Attendance.student_id,
+        Attendance.course_id,
+        Attendance.status,
+        func.row_number().over(partition_by=enrollment, order_by=Attendance.date.desc()).label('recency'),
+        func.sum(case((Attendance.status == 'absent', 0), else_=1)).over(
+            partition_by=enrollment, order_by=Attendance.date.desc(), rows=(None, 0)
+        ).label('island')
+    ).join(
+        cutoffs,
+        and_(cutoffs.c.course_id == Attendance.course_id, Attendance.date >= cutoffs.c.since)
+    ).subquery()
+    
+    in_window = recent.c.recency <= window
+    is_attended = recent.c.status.in_(('present', 'late'))
+    stats = select(
+        recent.c.student_id,
+        recent.c.course_id,
+        func.sum(case((recent.c.island == 0, 1), else_=0)).label('absence_streak'),
+        func.sum(case((in_window, 1), else_=0)).label('recent_sessions'),
+        func.sum(case((and_(in_window, is_attended), 1), else_=0)).label('recent_attended'),
+        func.sum(case((in_window, 0), else_=1)).label('prior_sessions'),
+        func.sum(case((and_(~in_window, is_attended), 1), else_=0)).label('prior_attended')
+    ).group_by(recent.c.student_id, recent.c.course_id).subquery()
+    
+    recent_rate = stats.c.recent_attended * 100.0 / stats.c.recent_sessions
+    prior_rate = case((stats.c.prior_sessions > 0, stats.c.prior_attended * 100.0 / stats.c.prior_sessions))
+    rate_change = recent_rate - prior_rate
+    
+    rows = db.session.execute(
+        select(
+            stats.c.student_id,
+            stats.c.course_id,
+            stats.c.absence_streak,
+            recent_rate,
+            prior_rate,
+            rate_change
+        ).where(
+            or_(stats.c.absence_streak >= streak, rate_change <= -drop)
+        ).order_by(
+            stats.c.absence_streak.desc(), rate_change.asc().nulls_last(), stats.c.student_id, stats.c.course_id
+        )
+    )
+    return [
+        [student_id, course_id, absence_streak, *(None if rate is None else round(rate, 2) for rate in rates)]
+        for student_id, course_id, absence_streak, *rates in rows
+    ]
+
+def _supports_materialized_cte():
+    """Whether the database accepts ``WITH name AS MATERIALIZED``"""
+    dialect = db.session.get_bind().dialect
+    minimum = MATERIALIZED_CTE_VERSIONS.get(dialect.name)
+    return minimum is not None and (dialect.server_version_info or ()) >= minimum
+
+def _at_risk_page(rows, page, per_page):
+    """Paginate at-risk rows, shaped like utils.helpers.paginate"""
+    page = max(1, page)
+    per_page = min(100, max(1, per_page))
+    total = len(rows)
+    pages = -(-total // per_page)
+    rows = rows[(page - 1) * per_page:page * per_page]
+    
+    # Names are only loaded for the rows on this page
+    students = {user.id: user for user in User.query.filter(User.id.in_({row[0] for row in rows}))}
+    courses = {course.id: course for course in Course.query.filter(Course.id.in_({row[1] for row in rows}))}
+    items = [
+        {
+            'student': students[student_id].to_dict(),
+            'course': {'id': course_id, 'code': courses[course_id].code, 'name': courses[course_id].name},
+            'absence_streak': absence_streak,
+            'recent_rate': recent_rate,
+            'prior_rate': prior_rate,
+            'rate_change': rate_change
+        }
+        for student_id, course_id, absence_streak, recent_rate, prior_rate, rate_change in rows
+    ]
+    
+    return {
+        'items': items,
+        'total': total,
+        'pages': pages,
+        'page': page,
+        'per_page': per_page,
+        'has_next': page < pages,
+        'has_prev': page > 1
+    }
+
+def _export_rows(course_id):
+    """Stream export rows for a course in server-side batches
+    
+    Only the exported columns are selected, with the student's name and
+    email joined in, so no ORM objects are built per row.
+    """
+    return db.session.query(
+        User.username,
+        User.email,
+        Attendance.date,
+        Attendance.status,
+        Attendance.check_in_time,
+        Attendance.notes
+    ).join(
+        User, User.id == Attendance.student_id
+    ).filter(
+        Attendance.course_id == course_id
+    ).order_by(Attendance.date.desc()).yield_per(EXPORT_BATCH_SIZE)
+
+def _export_filename(course, extension):
+    """Download filename for a course export"""
+    return f'attendance_{course.code}_{datetime.now().strftime("%Y%m%d")}.{extension}'
+
+def _set_attachment(response, filename):
+    """Set Content-Disposition as send_file(download_name=...) does
+    
+    Names are quoted as needed, and non-ASCII names get an ASCII fallback
+    plus an RFC 2231 ``filename*`` so the header stays Latin-1.
+    """
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        names = {'filename': simple, 'filename*': f"UTF-8''{quote(filename, safe='!#$&+-.^_`|~')}"}
+    else:
+        names = {'filename': filename}
+    response.headers.set('Content-Disposition', 'attachment', **names)
+    return response
+
 @bp.route('/export/<int:course_id>', methods=['GET'])
 @jwt_required()
 def export_course_attendance(course_id):
@@ -126,71 +459,70 @@ def export_course_attendance(course_id):
     course = Course.query.get_or_404(course_id)
     
     # Check permissions
-    if role == 'teacher' and course.teacher_id != user_id:
+    if role == 'teacher' and not is_course_teacher(course, user_id):
         return error_response('Access denied', 403)
     elif role == 'student':
         return error_response('Access denied', 403)
     
     format_type = request.args.get('format', 'csv').lower()
     
-    # Get attendance records
-    records = Attendance.query.filter_by(course_id=course_id).order_by(Attendance.date.desc()).all()
-    
     if format_type == 'csv':
-        # Generate CSV
-        si = StringIO()
-        writer = csv.writer(si)
-        writer.writerow(['Student Name', 'Student Email', 'Date', 'Status', 'Check-in Time', 'Notes'])
-        
-        for record in records:
-            writer.writerow([
-                record.student.username,
-                record.student.email,
-                record.date.isoformat(),
-                record.status,
-                record.check_in_time.isoformat() if record.check_in_time else '',
-                record.notes or ''
-            ])
+        # Stream CSV in chunks so memory does not grow with the row count
+        def generate():
+            buffer = StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_HEADERS)
+            
+            for i, row in enumerate(_export_rows(course_id), 1):
+                writer.writerow([
+                    row.username,
+                    row.email,
+                    row.date.isoformat(),
+                    row.status,
+                    row.check_in_time.isoformat() if row.check_in_time else '',
+                    row.notes or ''
+                ])
+                if i % EXPORT_BATCH_SIZE == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            
+            yield buffer.getvalue()
         
-        output = BytesIO()
-        output.write(si.getvalue().encode('utf-8'))
-        output.seek(0)
-        
-        return send_file(
-            output,
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name=f'attendance_{course.code}_{datetime.now().strftime("%Y%m%d")}.csv'
+        return _set_attachment(
+            Response(stream_with_context(generate()), mimetype='text/csv'),
+            _export_filename(course, 'csv')
         )
     
     elif format_type == 'xlsx':
-        # Generate Excel
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = 'Attendance'
+        # Write-only workbooks keep no cell objects in memory; the finished
+        # file is spooled to disk once it outgrows EXPORT_SPOOL_SIZE.
+        # openpyxl is slow to import, so only exports load it
+        import openpyxl
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet('Attendance')
         
         # Headers
-        headers = ['Student Name', 'Student Email', 'Date', 'Status', 'Check-in Time', 'Notes']
-        ws.append(headers)
+        ws.append(EXPORT_HEADERS)
         
-        for record in records:
+        for row in _export_rows(course_id):
             ws.append([
-                record.student.username,
-                record.student.email,
-                record.date.isoformat(),
-                record.status,
-                record.check_in_time.isoformat() if record.check_in_time else '',
-                record.notes or ''
+                row.username,
+                row.email,
+                row.date,
+                row.status,
+                row.check_in_time,
+                row.notes
             ])
         
-        output = BytesIO()
+        output = SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
         wb.save(output)
         output.seek(0)
         return send_file(
             output,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
-            download_name=f'attendance_{course.code}_{datetime.now().strftime("%Y%m%d")}.xlsx'
+            download_name=_export_filename(course, 'xlsx')
         )
     
     else:
@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..models import db, User
 from ..utils.helpers import success_response, error_response, paginate
 from ..utils.decorators import admin_required
+from ..utils.report_cache import bump_user_report_versions
+from ..utils.search import apply_search
 
 bp = Blueprint("users", __name__)
 
@@ -23,9 +25,7 @@ def get_users():
         query = query.filter_by(role=role)
 
     if search:
-        query = query.filter(
-            (User.username.ilike(f"%{search}%")) | (User.email.ilike(f"%{search}%"))
-        )
+        query = apply_search(query, User, search)
 
     result = paginate(query.order_by(User.created_at.desc()), page, per_page)
     return success_response(result)
@@ -73,6 +73,7 @@ def update_user(user_id):
         user.set_password(data["password"])
 
     try:
+        bump_user_report_versions(user_id)
         db.session.commit()
         return success_response(user.to_dict(), "User updated successfully")
     except Exception as e:
@@ -87,12 +88,13 @@ def delete_user(user_id):
     """Delete user (admin only)"""
     current_user_id = get_jwt_identity()
 
-    if user_id == current_user_id:
+    if user_id == int(current_user_id):
         return error_response("Cannot delete yourself", 400)
 
     user = User.query.get_or_404(user_id)
 
     try:
+        bump_user_report_versions(user_id)
         db.session.delete(user)
         db.session.commit()
         return success_response(message="User deleted successfully")
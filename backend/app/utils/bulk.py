@@ -0,0 +1,47 @@
+from sqlalchemy import and_, false, or_
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+def chunked(items, size):
+    """Split a list into consecutive chunks of at most size items"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def key_in(columns, keys):
+    """Filter for rows whose columns equal one of the key tuples
+
+    SQLite answers a row-value ``IN`` list with a full table scan, so the
+    keys are written as ORed equality groups instead, each of which is a
+    single index lookup.
+    """
+    if not keys:
+        return false()
+    return or_(*(and_(*(column == value for column, value in zip(columns, key))) for key in keys))
+
+def upsert(session, table, rows, index_elements, set_=None, chunk_size=500):
+    """Insert rows with a dialect-aware INSERT ... ON CONFLICT statement
+
+    ``set_`` receives the proposed row (``excluded`` / ``inserted``) and
+    returns the columns to update on conflict. Without it conflicting rows
+    are left untouched.
+    """
+    dialect = session.get_bind().dialect.name
+
+    for chunk in chunked(rows, chunk_size):
+        if dialect in ('postgresql', 'sqlite'):
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = insert(table).values(chunk)
+            if set_ is None:
+                stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+            else:
+                stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=set_(stmt.excluded))
+        elif dialect in ('mysql', 'mariadb'):
+            stmt = mysql.insert(table).values(chunk)
+            if set_ is None:
+                # Assigning a key column to itself turns the conflict into a no-op
+                stmt = stmt.on_duplicate_key_update({index_elements[0]: table.c[index_elements[0]]})
+            else:
+                stmt = stmt.on_duplicate_key_update(set_(stmt.inserted))
+        else:
+            raise ValueError(f'Bulk upsert is not supported for the {dialect} dialect')
+
+        session.execute(stmt)
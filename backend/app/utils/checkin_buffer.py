@@ -0,0 +1,146 @@
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from ..models import db, Attendance
+from .bulk import key_in, upsert
+from .summary import lock_enrollments, record_status_changes
+from .serializers import attendance_listing_query, serialize_attendance_rows
+
+class CheckinTimeout(Exception):
+    """Raised when a queued check-in is not committed within the ack timeout"""
+
+class _PendingCheckin:
+    def __init__(self, student_id, course_id, day):
+        self.key = (int(student_id), int(course_id), day)
+        self.check_in_time = datetime.utcnow()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class CheckinBuffer:
+    """Coalesce QR check-ins into batched upserts
+
+    Request threads queue validated check-ins and wait for the background
+    flusher, which commits everything that arrived within
+    ``CHECKIN_FLUSH_INTERVAL`` seconds (or ``CHECKIN_BATCH_SIZE`` rows) in a
+    single transaction. Callers still get a synchronous acknowledgement,
+    but a burst of check-ins takes one write lock per batch instead of one
+    per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.batch_size = app.config['CHECKIN_BATCH_SIZE']
+        self.flush_interval = app.config['CHECKIN_FLUSH_INTERVAL']
+        self.ack_timeout = app.config['CHECKIN_ACK_TIMEOUT']
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        app.extensions['checkin_buffer'] = self
+
+    def submit(self, student_id, course_id, day):
+        """Queue a check-in and block until it is committed
+
+        Returns the attendance record as a dict; raises CheckinTimeout if the
+        batch is not written in time, or re-raises the flush error.
+        """
+        self._ensure_started()
+        pending = _PendingCheckin(student_id, course_id, day)
+        self._queue.put(pending)
+
+        if not pending.done.wait(self.ack_timeout):
+            raise CheckinTimeout('Check-in was not committed in time')
+        if pending.error:
+            raise pending.error
+        return pending.result
+
+    def _ensure_started(self):
+        # Started lazily, and again after a fork, so pre-forking servers
+        # get one flusher per worker process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='checkin-flusher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        with self.app.app_context():
+            try:
+                results = self._write(batch)
+                for pending in batch:
+                    pending.result = results.get(pending.key)
+            except Exception as e:
+                db.session.rollback()
+                for pending in batch:
+                    pending.error = e
+            finally:
+                db.session.remove()
+                for pending in batch:
+                    pending.done.set()
+
+    def _write(self, batch):
+        """Upsert a batch of check-ins and return their records keyed by row key"""
+        # Repeated check-ins within a batch collapse to the latest one
+        latest = {pending.key: pending for pending in batch}
+        keys = list(latest)
+        key_filter = key_in((Attendance.student_id, Attendance.course_id, Attendance.date), keys)
+
+        lock_enrollments((key[:2] for key in keys), self.batch_size)
+        existing = dict(
+            ((student_id, course_id, day), status)
+            for student_id, course_id, day, status in db.session.query(
+                Attendance.student_id, Attendance.course_id, Attendance.date, Attendance.status
+            ).filter(key_filter)
+        )
+
+        upsert(
+            db.session,
+            Attendance.__table__,
+            [
+                {
+                    'student_id': key[0],
+                    'course_id': key[1],
+                    'date': key[2],
+                    'status': 'present',
+                    'check_in_time': pending.check_in_time
+                }
+                for key, pending in latest.items()
+            ],
+            index_elements=['student_id', 'course_id', 'date'],
+            set_=lambda excluded: {
+                'status': excluded.status,
+                'check_in_time': excluded.check_in_time
+            },
+            chunk_size=self.batch_size
+        )
+        record_status_changes(
+            (key[0], key[1], existing.get(key), 'present')
+            for key in keys
+        )
+        db.session.commit()
+
+        rows = attendance_listing_query().filter(key_filter).all()
+        return {
+            (row.student_id, row.course_id, row.date): record
+            for row, record in zip(rows, serialize_attendance_rows(rows))
+        }
@@ -0,0 +1,49 @@
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+from flask import current_app
+
+# Upper-case base32 and ':' stay inside the QR alphanumeric character set,
+# which keeps the code at a low version
+TOKEN_PREFIX = 'CI'
+SIGNATURE_BYTES = 10
+NONCE_BYTES = 5
+
+def _b32(data):
+    return base64.b32encode(data).decode('ascii').rstrip('=')
+
+def _signature(payload):
+    key = hmac.new(current_app.config['SECRET_KEY'].encode('utf-8'), b'checkin-token', hashlib.sha256).digest()
+    return _b32(hmac.new(key, payload.encode('ascii'), hashlib.sha256).digest()[:SIGNATURE_BYTES])
+
+def current_window():
+    """Index of the current QR rotation window"""
+    return int(time.time() // current_app.config['QR_ROTATION_SECONDS'])
+
+def create_checkin_token(course_id, window=None):
+    """Create a compact signed check-in token: CI:<course>:<window>:<nonce>:<signature>
+
+    These tokens are not JWTs, so they can never pass as access tokens.
+    """
+    window = current_window() if window is None else window
+    payload = f'{TOKEN_PREFIX}:{int(course_id)}:{window}:{_b32(secrets.token_bytes(NONCE_BYTES))}'
+    return f'{payload}:{_signature(payload)}'
+
+def verify_checkin_token(token):
+    """Return the course id of a valid, unexpired check-in token, else None"""
+    if not isinstance(token, str) or not token.isascii():
+        return None
+    payload, _, signature = token.rpartition(':')
+    parts = payload.split(':')
+    if len(parts) != 4 or parts[0] != TOKEN_PREFIX:
+        return None
+    if not hmac.compare_digest(signature.encode('ascii'), _signature(payload).encode('ascii')):
+        return None
+
+    course_id, window = int(parts[1]), int(parts[2])
+    window_start = window * current_app.config['QR_ROTATION_SECONDS']
+    if not window_start <= time.time() < window_start + current_app.config['CHECKIN_TOKEN_TTL']:
+        return None
+    return course_id
@@ -1,6 +1,9 @@
+import base64
+import binascii
+import json
 from flask import jsonify
-from datetime import datetime
-from dateutil import parser as date_parser
+from datetime import date, datetime
+from sqlalchemy import tuple_
 
 def success_response(data=None, message=None, status=200):
     """Standard success response"""
@@ -11,6 +14,10 @@ def success_response(data=None, message=None, status=200):
         response['data'] = data
     return jsonify(response), status
 
+def is_course_teacher(course, user_id):
+    """Whether the user with this JWT identity (a string) teaches the course"""
+    return course.teacher_id == int(user_id)
+
 def error_response(message, status=400, errors=None):
     """Standard error response"""
     response = {
@@ -21,14 +28,29 @@ def error_response(message, status=400, errors=None):
         response['errors'] = errors
     return jsonify(response), status
 
-def paginate(query, page=1, per_page=20):
-    """Paginate a SQLAlchemy query"""
+def paginate(query, page=1, per_page=20, cursor=None, keys=None, include_total=True, serialize=None):
+    """Paginate a SQLAlchemy query
+    
+    Passing a ``cursor`` (an empty string for the first page) together with
+    the ``keys`` columns switches to keyset pagination: rows are ordered by
+    ``keys`` descending and each page seeks past the previous one, so deep
+    pages cost the same as the first. The total count is then only computed
+    when ``include_total`` is set. Raises ValueError for a malformed cursor.
+    
+    ``serialize`` turns the whole page of items into dicts at once, which
+    lets callers batch any related data; by default each item's
+    ``to_dict`` is used.
+    """
+    serialize = serialize or _serialize_items
     page = max(1, page)
     per_page = min(100, max(1, per_page))
     
+    if cursor is not None and keys:
+        return _paginate_keyset(query, cursor, keys, per_page, include_total, serialize)
+    
     paginated = query.paginate(page=page, per_page=per_page, error_out=False)
     
-    return {        'items': [item.to_dict() if hasattr(item, 'to_dict') else item for item in paginated.items],
+    return {        'items': serialize(paginated.items),
         'total': paginated.total,
         'pages': paginated.pages,
         'page': page,
@@ -37,11 +59,62 @@ def paginate(query, page=1, per_page=20):
         'has_prev': paginated.has_prev
     }
 
+def _serialize_items(items):
+    return [item.to_dict() if hasattr(item, 'to_dict') else item for item in items]
+
+def _paginate_keyset(query, cursor, keys, per_page, include_total, serialize):
+    """Keyset pagination over ``keys`` in descending order"""
+    total = query.order_by(None).count() if include_total else None
+    
+    if cursor:
+        query = query.filter(tuple_(*keys) < tuple_(*decode_cursor(cursor, keys)))
+    
+    # Fetch one extra row to know whether another page follows
+    rows = query.order_by(None).order_by(*[key.desc() for key in keys]).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    
+    result = {
+        'items': serialize(rows),
+        'per_page': per_page,
+        'has_next': has_next,
+        'next_cursor': encode_cursor([getattr(rows[-1], key.key) for key in keys]) if has_next else None
+    }
+    if total is not None:
+        result['total'] = total
+    return result
+
+def encode_cursor(values):
+    """Encode key values as an opaque, URL-safe cursor"""
+    raw = json.dumps([value.isoformat() if isinstance(value, date) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, keys):
+    """Decode a cursor produced by encode_cursor back into key values"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError('cursor does not match the pagination keys')
+        return [
+            key.type.python_type.fromisoformat(value) if issubclass(key.type.python_type, date) else value
+            for key, value in zip(keys, values)
+        ]
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f'Invalid cursor: {e}')
+
+def _parse_fuzzy(value):
+    # dateutil is only imported for strings that are not ISO 8601
+    from dateutil import parser as date_parser
+    return date_parser.parse(value)
+
 def parse_date(date_string):
     """Parse date string to date object"""
     try:
         if isinstance(date_string, str):
-            return date_parser.parse(date_string).date()
+            try:
+                return date.fromisoformat(date_string)
+            except ValueError:
+                return _parse_fuzzy(date_string).date()
         return date_string
     except:
         return None
@@ -50,7 +123,10 @@ def parse_datetime(datetime_string):
     """Parse datetime string to datetime object"""
     try:
         if isinstance(datetime_string, str):
-            return date_parser.parse(datetime_string)
+            try:
+                return datetime.fromisoformat(datetime_string)
+            except ValueError:
+                return _parse_fuzzy(datetime_string)
         return datetime_string
     except:
         return None
\ No newline at end of file
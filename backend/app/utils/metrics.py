@@ -0,0 +1,180 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, request, request_finished, request_started, has_request_context
+from sqlalchemy import event
+
+ENVIRON_KEY = 'zitiacademy.metrics'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Slow-request log entries keep at most this many statements, each trimmed
+SLOW_LOG_MAX_STATEMENTS = 50
+SLOW_LOG_MAX_STATEMENT_LENGTH = 500
+
+class _RequestState:
+    __slots__ = ('started', 'sql_count', 'sql_time', 'statements')
+
+    def __init__(self, keep_statements):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.statements = [] if keep_statements else None
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}'
+
+class RequestMetrics:
+    """Per-route latency, SQL and response size metrics
+
+    Flask request signals time each request and SQLAlchemy cursor events
+    count the statements it runs; the totals are folded into in-process
+    histograms served at /api/metrics in Prometheus text format. Streamed
+    responses are recorded when their body has been sent. With
+    ``SLOW_REQUEST_MS`` set, slower requests are logged with their SQL.
+    With ``METRICS_TOKEN`` set, scrapes must send it as a bearer token.
+
+    Metrics are per process, so scrape each server worker separately.
+    """
+
+    def __init__(self, app, engine):
+        self.slow_request_ms = app.config['SLOW_REQUEST_MS']
+        self.token = app.config['METRICS_TOKEN']
+        self.logger = app.logger
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._statements = {}
+        self._sql_seconds = {}
+        self._sizes = {}
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        request_started.connect(self._request_started, app)
+        request_finished.connect(self._request_finished, app)
+        app.add_url_rule('/api/metrics', 'metrics', self.metrics_view, methods=['GET'])
+        app.extensions['request_metrics'] = self
+
+    def _request_started(self, sender, **extra):
+        request.environ[ENVIRON_KEY] = _RequestState(self.slow_request_ms > 0)
+
+    def _request_finished(self, sender, response, **extra):
+        state = request.environ.get(ENVIRON_KEY)
+        if state is None:
+            return
+        method = request.method
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        if response.is_streamed:
+            # The body (and any SQL it runs) is produced after this signal
+            response.call_on_close(lambda: self._record(state, method, route, response.status_code, None))
+        else:
+            self._record(state, method, route, response.status_code, response.content_length)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['metrics_started'] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop('metrics_started', None)
+        if started is None or not has_request_context():
+            return
+        state = request.environ.get(ENVIRON_KEY)
+        if state is None:
+            return
+        elapsed = time.perf_counter() - started
+        state.sql_count += 1
+        state.sql_time += elapsed
+        if state.statements is not None and len(state.statements) < SLOW_LOG_MAX_STATEMENTS:
+            state.statements.append((elapsed, statement))
+
+    def _record(self, state, method, route, status, size):
+        duration = time.perf_counter() - state.started
+        with self._lock:
+            key = (method, route, status)
+            if key not in self._durations:
+                self._durations[key] = _Histogram(DURATION_BUCKETS)
+            self._durations[key].observe(duration)
+
+            key = (method, route)
+            if key not in self._statements:
+                self._statements[key] = _Histogram(STATEMENT_BUCKETS)
+                self._sql_seconds[key] = 0.0
+            self._statements[key].observe(state.sql_count)
+            self._sql_seconds[key] += state.sql_time
+            if size is not None:
+                if key not in self._sizes:
+                    self._sizes[key] = _Histogram(SIZE_BUCKETS)
+                self._sizes[key].observe(size)
+
+        if state.statements is not None and duration * 1000 >= self.slow_request_ms:
+            self.logger.warning(
+                'Slow request %s %s: %.1fms, %d SQL statements in %.1fms\n%s',
+                method, route, duration * 1000, state.sql_count, state.sql_time * 1000,
+                '\n'.join(
+                    f'  {elapsed * 1000:.2f}ms {statement[:SLOW_LOG_MAX_STATEMENT_LENGTH]}'
+                    for elapsed, statement in state.statements
+                )
+            )
+
+    def render(self):
+        """Current metrics in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            self._render_histograms(
+                lines, 'http_request_duration_seconds', 'Request latency by route',
+                ('method', 'route', 'status'), self._durations
+            )
+            self._render_histograms(
+                lines, 'http_request_sql_statements', 'SQL statements executed per request',
+                ('method', 'route'), self._statements
+            )
+            lines.append('# HELP http_request_sql_seconds_total Time spent in SQL by route')
+            lines.append('# TYPE http_request_sql_seconds_total counter')
+            for key, seconds in self._sql_seconds.items():
+                lines.append(f'http_request_sql_seconds_total{_labels(("method", "route"), key)} {seconds:.6f}')
+            self._render_histograms(
+                lines, 'http_response_size_bytes', 'Response body size (streamed bodies excluded)',
+                ('method', 'route'), self._sizes
+            )
+        return '\n'.join(lines) + '\n'
+
+    def _render_histograms(self, lines, name, help_text, label_names, histograms):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for key, histogram in histograms.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                labels = _labels(label_names, key, 'le="%s"' % bound)
+                lines.append(f'{name}_bucket{labels} {cumulative}')
+            cumulative += histogram.counts[-1]
+            labels = _labels(label_names, key, 'le="+Inf"')
+            lines.append(f'{name}_bucket{labels} {cumulative}')
+            lines.append(f'{name}_sum{_labels(label_names, key)} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{_labels(label_names, key)} {cumulative}')
+
+    def metrics_view(self):
+        if self.token:
+            scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+            if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode('utf-8'), self.token.encode('utf-8')):
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
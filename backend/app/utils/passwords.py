@@ -0,0 +1,33 @@
+import bcrypt
+
+def _hash_rounds(password_hash):
+    # bcrypt hashes look like $2b$<rounds>$<salt+digest>
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+class PasswordHasher:
+    """bcrypt hashing with a configurable cost
+
+    ``BCRYPT_LOG_ROUNDS`` sets the cost for new hashes; ``needs_rehash``
+    reports hashes made with another cost so logins can upgrade them.
+    bcrypt releases the GIL while it works, so concurrent logins already
+    hash in parallel on the server's request threads.
+    """
+
+    def __init__(self, app):
+        self.rounds = app.config['BCRYPT_LOG_ROUNDS']
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        """Hash a password with the configured cost"""
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(self.rounds)).decode('utf-8')
+
+    def check(self, password_hash, password):
+        """Verify a password against a stored hash"""
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with a different cost"""
+        return _hash_rounds(password_hash) != self.rounds
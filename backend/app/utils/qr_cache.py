@@ -0,0 +1,35 @@
+import threading
+from collections import OrderedDict
+
+class QRCodeCache:
+    """Bounded LRU cache of rendered check-in QR codes
+
+    Each course/format pair keeps only the image for its current rotation
+    window, so every poll within a window reuses one render and the least
+    recently used courses are evicted once ``max_entries`` is reached.
+    """
+
+    def __init__(self, app):
+        self.max_entries = app.config['QR_CACHE_SIZE']
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        app.extensions['qr_cache'] = self
+
+    def get_or_create(self, key, window, factory):
+        """Return the cached value for key in this window, rendering it if needed"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == window:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        # Render outside the lock; concurrent misses may both render, but
+        # only one result is kept
+        value = factory()
+
+        with self._lock:
+            self._entries[key] = (window, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
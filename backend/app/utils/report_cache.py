@@ -0,0 +1,163 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, current_app, request
+from sqlalchemy import or_, select, update
+from ..models import db, Course, Enrollment
+
+class MemoryBackend:
+    """Per-process LRU store with a TTL"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class RedisBackend:
+    """Store shared by every server process in Redis (or a compatible server)
+
+    Entries expire after the TTL; configure the server with an LRU
+    ``maxmemory-policy`` to bound its size.
+    """
+
+    def __init__(self, url, ttl, prefix='report:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('REPORT_CACHE_BACKEND=redis requires the redis package')
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+class ReportCache:
+    """Versioned cache of rendered report responses
+
+    Keys embed the report_version of every course a report reads, and
+    writes that change report data bump those versions in the same
+    transaction, so a stale entry is never looked up again; LRU and the
+    TTL only reclaim space. Entries store the JSON body with its ETag so
+    repeat requests can be answered with 304 Not Modified.
+    """
+
+    def __init__(self, app):
+        backend = app.config['REPORT_CACHE_BACKEND']
+        ttl = app.config['REPORT_CACHE_TTL']
+        if backend == 'memory':
+            self.backend = MemoryBackend(app.config['REPORT_CACHE_SIZE'], ttl)
+        elif backend == 'redis':
+            self.backend = RedisBackend(app.config['REPORT_CACHE_URL'], ttl)
+        elif backend == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f'Unknown REPORT_CACHE_BACKEND: {backend}')
+        app.extensions['report_cache'] = self
+
+    def clear(self):
+        """Drop every cached report"""
+        if self.backend is not None:
+            self.backend.clear()
+
+    def fetch(self, key, build):
+        """Return the cached value for key, calling build() on a miss
+
+        For intermediate results shared by several responses; values must
+        be JSON serializable.
+        """
+        if self.backend is None:
+            return build()
+
+        entry = self.backend.get(key)
+        if entry is not None:
+            return json.loads(entry)
+        value = build()
+        self.backend.set(key, json.dumps(value).encode('utf-8'))
+        return value
+
+    def respond(self, key, build):
+        """Serve the cached response for key, calling build() on a miss
+
+        build() returns a normal view result; only 200 responses are cached.
+        """
+        if self.backend is None:
+            return build()
+
+        entry = self.backend.get(key)
+        status = 'HIT'
+        if entry is None:
+            status = 'MISS'
+            response = current_app.make_response(build())
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            entry = hashlib.sha1(body).hexdigest().encode('ascii') + b'\n' + body
+            self.backend.set(key, entry)
+
+        etag, _, body = entry.partition(b'\n')
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag.decode('ascii'))
+        # Browsers must revalidate, since any write can change the report
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.headers['X-Cache'] = status
+        return response.make_conditional(request)
+
+def cache_key(*parts):
+    return ':'.join('' if part is None else str(part) for part in parts)
+
+def versions_digest(versions):
+    """Short digest of (course_id, report_version) pairs"""
+    return hashlib.sha1(repr(sorted(versions)).encode('ascii')).hexdigest()[:16]
+
+def bump_report_versions(course_ids):
+    """Invalidate cached reports of these courses in the current transaction"""
+    course_ids = sorted({int(course_id) for course_id in course_ids})
+    if course_ids:
+        db.session.execute(
+            update(Course).where(Course.id.in_(course_ids)).values(
+                report_version=Course.report_version + 1
+            ).execution_options(synchronize_session=False)
+        )
+
+def bump_user_report_versions(user_id):
+    """Invalidate reports that show this user: courses they teach or attend"""
+    db.session.execute(
+        update(Course).where(or_(
+            Course.teacher_id == user_id,
+            Course.id.in_(select(Enrollment.course_id).where(Enrollment.student_id == user_id))
+        )).values(report_version=Course.report_version + 1).execution_options(synchronize_session=False)
+    )
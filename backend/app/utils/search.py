@@ -0,0 +1,75 @@
+import re
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+from ..models import db, User, Course
+
+# FTS5 index (see migration 0005) and the columns it covers, per model
+SEARCH_INDEXES = {
+    User: ('users_fts', (User.username, User.email)),
+    Course: ('courses_fts', (Course.name, Course.code))
+}
+
+# Insert, delete and update triggers of migration 0005 that keep each index
+# in sync with its base table
+SEARCH_TRIGGERS = ('ai', 'ad', 'au')
+
+# bm25 costs a few microseconds per match, so terms matching more rows than
+# this (e.g. a shared email domain) keep the caller's ordering instead
+RANK_LIMIT = 2000
+
+# Same word boundaries as the unicode61 tokenizer: letters and digits only
+TOKEN = re.compile(r'[^\W_]+')
+
+def fts_query(term):
+    """Turn free text into an FTS5 query
+
+    Each whitespace-separated word matches as an exact phrase or as a
+    phrase whose last token is a prefix, so ``jo`` matches "John" and
+    ``ann@exa`` matches "ann@example.com". An exact match scores in both
+    branches, so bm25 ranks "john" above "johnny" for ``john``. Every word
+    must match.
+    """
+    groups = []
+    for word in term.split():
+        tokens = TOKEN.findall(word)
+        if tokens:
+            phrase = '"%s"' % ' '.join(tokens)
+            groups.append(f'({phrase} OR {phrase}*)')
+    return ' AND '.join(groups)
+
+def apply_search(query, model, term):
+    """Filter a query on model to rows matching term, best matches first
+
+    On SQLite this uses the FTS5 index and orders rows by bm25 rank ahead of
+    any ordering the caller adds, unless more than RANK_LIMIT rows match.
+    Other databases fall back to a substring match.
+    """
+    index, columns = SEARCH_INDEXES[model]
+    match = fts_query(term)
+    if not match or db.session.get_bind().dialect.name != 'sqlite':
+        return query.filter(or_(*(indexed.ilike(f'%{term}%') for indexed in columns)))
+
+    fts = table(index, column('rowid'), column('rank'))
+    matches = literal_column(index).op('MATCH')(match)
+    probe = select(fts.c.rowid).where(matches).limit(RANK_LIMIT + 1).subquery()
+    ranked = db.session.execute(select(func.count()).select_from(probe)).scalar() <= RANK_LIMIT
+
+    columns = [fts.c.rowid.label('id')] + ([fts.c.rank.label('rank')] if ranked else [])
+    hits = select(*columns).where(matches).subquery()
+    query = query.join(hits, hits.c.id == model.id)
+    return query.order_by(hits.c.rank) if ranked else query
+
+def missing_search_objects():
+    """Names of the FTS5 index tables and sync triggers missing on SQLite
+
+    A batch migration that recreates users or courses drops their triggers
+    without an error, after which writes silently stop reaching the index.
+    """
+    if db.session.get_bind().dialect.name != 'sqlite':
+        return []
+    expected = []
+    for index, _ in SEARCH_INDEXES.values():
+        expected += [index] + [f'{index}_{suffix}' for suffix in SEARCH_TRIGGERS]
+    present = {name for name, in db.session.execute(
+        text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+    )}
+    return [name for name in expected if name not in present]
@@ -0,0 +1,85 @@
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from ..models import db, Attendance, Course, Enrollment, User
+
+def course_load_options(include_students=False):
+    """Loader options for everything serialize_courses reads
+    
+    Apply these to the query that fetches the courses so teachers (and
+    rosters, when requested) arrive in batched IN queries instead of one
+    lazy load per course.
+    """
+    options = [selectinload(Course.teacher)]
+    if include_students:
+        options.append(selectinload(Course.enrollments).selectinload(Enrollment.student))
+    return options
+
+def enrolled_counts(course_ids):
+    """Enrollment counts for several courses from one grouped query"""
+    if not course_ids:
+        return {}
+    return dict(db.session.query(
+        Enrollment.course_id,
+        func.count(Enrollment.id)
+    ).filter(
+        Enrollment.course_id.in_(course_ids)
+    ).group_by(Enrollment.course_id).all())
+
+def serialize_courses(courses, include_students=False):
+    """Serialize courses without materialising enrollments just to count them"""
+    if include_students:
+        # Rosters are loaded anyway, so counting them is free
+        return [course.to_dict(include_students=True) for course in courses]
+    
+    counts = enrolled_counts([course.id for course in courses])
+    return [course.to_dict(enrolled_count=counts.get(course.id, 0)) for course in courses]
+
+def serialize_course(course, include_students=False):
+    """Serialize a single course; see serialize_courses"""
+    return serialize_courses([course], include_students)[0]
+
+def attendance_listing_query():
+    """Column-projected attendance rows joined with their student
+    
+    Pair with serialize_attendance_rows to list attendance without building
+    ORM objects or lazily loading each row's student.
+    """
+    return db.session.query(
+        Attendance.id,
+        Attendance.student_id,
+        Attendance.course_id,
+        Attendance.date,
+        Attendance.status,
+        Attendance.check_in_time,
+        Attendance.notes,
+        Attendance.marked_by,
+        Attendance.created_at,
+        User.username,
+        User.email,
+        User.role,
+        User.created_at.label('student_created_at')
+    ).join(User, User.id == Attendance.student_id)
+
+def serialize_attendance_rows(rows):
+    """Build Attendance.to_dict() shaped dicts from attendance_listing_query rows"""
+    return [
+        {
+            'id': row.id,
+            'student_id': row.student_id,
+            'student': {
+                'id': row.student_id,
+                'username': row.username,
+                'email': row.email,
+                'role': row.role,
+                'created_at': row.student_created_at.isoformat() if row.student_created_at else None
+            },
+            'course_id': row.course_id,
+            'date': row.date.isoformat() if row.date else None,
+            'status': row.status,
+            'check_in_time': row.check_in_time.isoformat() if row.check_in_time else None,
+            'notes': row.notes,
+            'marked_by': row.marked_by,
+            'created_at': row.created_at.isoformat() if row.created_at else None
+        }
+        for row in rows
+    ]
@@ -0,0 +1,75 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+def is_file_sqlite(uri):
+    """Whether the database URI points at an on-disk SQLite database"""
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def sqlite_engine_options(config):
+    """Engine options for an on-disk SQLite database
+
+    Every pooled connection stays open, so the per-connection pragmas and
+    page cache survive between requests; the pool is sized to the server's
+    threads.
+    """
+    return {
+        'pool_size': config['SQLITE_POOL_SIZE'],
+        'max_overflow': config['SQLITE_POOL_OVERFLOW'],
+        'pool_timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+        'connect_args': {
+            'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+            'check_same_thread': False
+        }
+    }
+
+def install_sqlite_pragmas(engine, config):
+    """Apply the production pragmas to every new connection
+
+    WAL lets readers and a writer run at the same time; synchronous=NORMAL
+    is durable across application crashes in WAL mode and only fsyncs at
+    checkpoints. ``PRAGMA optimize`` runs at most every
+    SQLITE_OPTIMIZE_INTERVAL seconds when a connection is checked out.
+    """
+    pragmas = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA busy_timeout={config['SQLITE_BUSY_TIMEOUT_MS']}",
+        f"PRAGMA mmap_size={config['SQLITE_MMAP_SIZE']}",
+        # A negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{config['SQLITE_CACHE_SIZE_KB']}",
+        'PRAGMA temp_store=MEMORY'
+    )
+    interval = config['SQLITE_OPTIMIZE_INTERVAL']
+    lock = threading.Lock()
+    last_optimized = [time.monotonic()]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    if interval <= 0:
+        return
+
+    @event.listens_for(engine, 'checkout')
+    def optimize(dbapi_connection, connection_record, connection_proxy):
+        if time.monotonic() - last_optimized[0] < interval or not lock.acquire(blocking=False):
+            return
+        try:
+            last_optimized[0] = time.monotonic()
+            cursor = dbapi_connection.cursor()
+            try:
+                # Bound the ANALYZE work optimize may do on large tables
+                cursor.execute('PRAGMA analysis_limit=400')
+                cursor.execute('PRAGMA optimize')
+            finally:
+                cursor.close()
+        finally:
+            lock.release()
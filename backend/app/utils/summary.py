@@ -0,0 +1,107 @@
+from collections import defaultdict
+from sqlalchemy import func, case, select, update
+from ..models import db, Attendance, AttendanceSummary, Course, Enrollment
+from .bulk import chunked, key_in, upsert
+from .report_cache import bump_report_versions
+
+STATUSES = ('present', 'late', 'absent', 'excused')
+
+def status_count_columns():
+    """Aggregate columns counting attendance rows in total and per status"""
+    return [func.count(Attendance.id).label('total')] + [
+        func.coalesce(func.sum(case((Attendance.status == status, 1), else_=0)), 0).label(status)
+        for status in STATUSES
+    ]
+
+def summary_columns():
+    """AttendanceSummary counts labelled like status_count_columns()"""
+    return [func.coalesce(AttendanceSummary.total, 0).label('total')] + [
+        func.coalesce(getattr(AttendanceSummary, status), 0).label(status)
+        for status in STATUSES
+    ]
+
+def lock_enrollments(pairs, chunk_size=500):
+    """Lock the enrollments of (student_id, course_id) pairs until commit
+    
+    Summary deltas are computed from the statuses a writer read, so writers
+    to the same enrollment must not interleave between that read and their
+    commit. Rows are locked in key order so concurrent writers cannot
+    deadlock; SQLite has no FOR UPDATE and serializes writers itself.
+    Returns the set of pairs that are enrolled.
+    """
+    enrolled = set()
+    for chunk in chunked(sorted({(int(student_id), int(course_id)) for student_id, course_id in pairs}), chunk_size):
+        enrolled.update(db.session.query(Enrollment.student_id, Enrollment.course_id).filter(
+            key_in((Enrollment.student_id, Enrollment.course_id), chunk)
+        ).order_by(Enrollment.student_id, Enrollment.course_id).with_for_update())
+    return enrolled
+
+def record_status_changes(changes):
+    """Apply attendance writes to the summary table in the current transaction
+    
+    ``changes`` yields ``(student_id, course_id, old_status, new_status)``
+    tuples; use ``None`` as the old status for inserts and as the new
+    status for deletes. Old statuses must be read after locking the
+    enrollment (lock_enrollments) or the attendance row itself, otherwise
+    a concurrent write can make the same delta apply twice.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(STATUSES + ('total',), 0))
+    for student_id, course_id, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        delta = deltas[(int(student_id), int(course_id))]
+        if old_status:
+            delta[old_status] -= 1
+            delta['total'] -= 1
+        if new_status:
+            delta[new_status] += 1
+            delta['total'] += 1
+    
+    table = AttendanceSummary.__table__
+    upsert(
+        db.session,
+        table,
+        [
+            {'student_id': student_id, 'course_id': course_id, **delta}
+            for (student_id, course_id), delta in deltas.items()
+        ],
+        index_elements=['student_id', 'course_id'],
+        set_=lambda excluded: {
+            column: table.c[column] + excluded[column]
+            for column in STATUSES + ('total',)
+        }
+    )
+    # Only status changes show up in reports
+    bump_report_versions(course_id for _, course_id in deltas)
+
+def _aggregate_attendance():
+    """SELECT computing summary rows from raw attendance history"""
+    return select(
+        Attendance.student_id,
+        Attendance.course_id,
+        *status_count_columns()
+    ).group_by(Attendance.student_id, Attendance.course_id)
+
+def rebuild_summary():
+    """Recompute the summary table from scratch; returns the row count"""
+    columns = ['student_id', 'course_id', 'total', *STATUSES]
+    db.session.execute(AttendanceSummary.__table__.delete())
+    db.session.execute(
+        AttendanceSummary.__table__.insert().from_select(columns, _aggregate_attendance())
+    )
+    db.session.execute(update(Course).values(report_version=Course.report_version + 1))
+    db.session.commit()
+    return AttendanceSummary.query.count()
+
+def verify_summary():
+    """Compare the summary table with raw attendance; returns mismatched keys"""
+    def key(row):
+        return row.student_id, row.course_id
+    
+    def counts(row):
+        return tuple(getattr(row, column) for column in ('total', *STATUSES))
+    
+    expected = {key(row): counts(row) for row in db.session.execute(_aggregate_attendance())}
+    # Rows emptied by deletes are kept at zero and match missing history
+    actual = {key(row): counts(row) for row in AttendanceSummary.query if any(counts(row))}
+    return sorted(k for k in expected.keys() | actual.keys() if expected.get(k) != actual.get(k))
@@ -0,0 +1,84 @@
+from datetime import date
+from .summary import STATUSES
+
+ROLLING_WINDOWS = (7, 30)
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Days before the requested start that the windows still read
+LOOKBACK_DAYS = max(max(ROLLING_WINDOWS), 14) - 1
+
+def _trailing_sums(values, window):
+    """Sum of each element and the window - 1 before it (fewer at the start)"""
+    import numpy as np
+    totals = np.concatenate(([0], np.cumsum(values)))
+    index = np.arange(1, len(values) + 1)
+    return totals[index] - totals[np.maximum(index - window, 0)]
+
+def _rate(attended, total):
+    """Attendance percentage, NaN where nothing was recorded"""
+    import numpy as np
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, attended / total * 100, np.nan)
+
+def _to_json(values):
+    """Round to 2 places and turn NaN into None"""
+    import numpy as np
+    return [None if value != value else value for value in np.round(values, 2).tolist()]
+
+def attendance_timeseries(counts, start_date=None, end_date=None):
+    """Daily attendance rates with rolling averages and week-over-week change
+
+    ``counts`` is an iterable of (date, status, count) rows. Counts are laid
+    out on a dense calendar-day array, so every window below is a fixed
+    number of days however sessions are spread. Rolling averages pool the
+    sessions in the trailing 7 and 30 days rather than averaging daily
+    rates, and the week-over-week delta is the change in the 7-day rate
+    from 7 days earlier, in percentage points. Only days with sessions from
+    start_date on are returned; counts should reach back LOOKBACK_DAYS
+    before start_date so the first windows are complete.
+    """
+    # NumPy is only needed here, so it is not imported at startup
+    import numpy as np
+
+    counts = list(counts)
+    # Day numbers convert far faster than date objects
+    days = (np.array([row[0].toordinal() for row in counts], dtype=np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+    if start_date:
+        start = np.datetime64(start_date, 'D')
+        first = start - LOOKBACK_DAYS
+    else:
+        start = first = days.min() if counts else None
+    last = np.datetime64(end_date, 'D') if end_date else days.max() if counts else start
+    if first is None:
+        start = first = last = np.datetime64('1970-01-01')
+        length = 0
+    else:
+        length = max(0, int((last - first) // np.timedelta64(1, 'D')) + 1)
+    status_index = {status: i for i, status in enumerate(STATUSES)}
+
+    grid = np.zeros((length, len(STATUSES)), dtype=np.int64)
+    if counts:
+        offsets = (days - first).astype(np.int64)
+        columns = np.array([status_index[row[1]] for row in counts])
+        values = np.array([row[2] for row in counts], dtype=np.int64)
+        inside = (offsets >= 0) & (offsets < length)
+        np.add.at(grid, (offsets[inside], columns[inside]), values[inside])
+
+    total = grid.sum(axis=1)
+    attended = grid[:, status_index['present']] + grid[:, status_index['late']]
+    series = {'attendance_rate': _rate(attended, total)}
+    for window in ROLLING_WINDOWS:
+        series[f'rolling_{window}'] = _rate(_trailing_sums(attended, window), _trailing_sums(total, window))
+    weekly = series['rolling_7']
+    series['wow_delta'] = np.concatenate((np.full(min(7, length), np.nan), weekly[7:] - weekly[:-7]))
+
+    sessions = np.flatnonzero(total)
+    sessions = sessions[first + sessions >= start]
+    dates = first + sessions
+    return {
+        'dates': [day.isoformat() for day in dates.tolist()],
+        'status_counts': {status: grid[sessions, i].tolist() for i, status in enumerate(STATUSES)},
+        'total': total[sessions].tolist(),
+        **{name: _to_json(values[sessions]) for name, values in series.items()}
+    }
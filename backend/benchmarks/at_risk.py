@@ -0,0 +1,99 @@
+"""Benchmark the at-risk report on a 20M-row attendance history
+
+At the default --scale 100 the dataset has 50k students, 2k courses and
+20M attendance rows; generating it takes several minutes the first time and
+is cached afterwards. The report is scoped to one semester (a third of the
+courses) or one course, each timed with an empty report cache, with the
+largest window the endpoint accepts, plus a cached repeat and paging
+through an already ranked list. Budgets are the "at_risk" entry of
+benchmarks/budgets.json and apply at --scale 100 only.
+
+    cd backend
+    python -m benchmarks.at_risk --output at-risk.json
+"""
+import argparse
+import itertools
+import os
+import sys
+from .common import (
+    StatementCounter, check_budgets, create_benchmark_app, environment_info,
+    load_budgets, measure, write_results
+)
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+BUDGET_SCALE = 100
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=BUDGET_SCALE, help='dataset scale; 100 gives 20M rows')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--regenerate', action='store_true', help='rebuild the cached dataset')
+    parser.add_argument('--budgets', default=BUDGETS_PATH)
+    parser.add_argument('--output', default='at-risk.json')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(args.scale, args.seed, regenerate=args.regenerate, name='at-risk')
+    client = app.test_client()
+    from flask_jwt_extended import create_access_token
+    from app.models import db, User, Course
+    from app.routes.reports import AT_RISK_MAX_WINDOW
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').first()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+        course = Course.query.order_by(Course.id).first()
+        counter = StatementCounter(db.engine)
+    report_cache = app.extensions['report_cache']
+
+    def get(query, cached=False):
+        def run():
+            if not cached:
+                report_cache.clear()
+            response = client.get(f'/api/reports/at-risk?{query}', headers=headers)
+            assert response.status_code == 200, (query, response.status_code)
+        return run
+
+    semester = f'per_page=50&semester={course.semester}&year={course.year}'
+    long_window = f'window={AT_RISK_MAX_WINDOW}&streak=5'
+    pages = itertools.count(2)
+
+    def next_page():
+        # A page not served before, from the ranked list cached by page 1
+        get(semester, cached=True)()
+        get(f'{semester}&page={next(pages)}', cached=True)()
+
+    scenarios = {
+        'semester': get(semester),
+        'semester_cached': get(semester, cached=True),
+        'semester_next_page': next_page,
+        'semester_long_window': get(f'{semester}&{long_window}'),
+        'course': get(f'per_page=50&course_id={course.id}'),
+        'course_long_window': get(f'per_page=50&course_id={course.id}&{long_window}')
+    }
+
+    results = {}
+    for name, fn in scenarios.items():
+        results[name] = measure(fn, args.iterations, counter)
+        result = results[name]
+        print(
+            f"{name:<22} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+            f"sql {result['sql']:>3}  peak {result['peak_mb']:>7.2f}MB"
+        )
+
+    budgets = load_budgets(args.budgets)
+    violations = check_budgets(results, budgets['at_risk']) if args.scale == BUDGET_SCALE else []
+    write_results(args.output, {
+        'benchmark': 'at_risk',
+        'scale': args.scale,
+        'seed': args.seed,
+        'environment': environment_info(),
+        'results': results,
+        'violations': violations
+    })
+    for violation in violations:
+        print(f'BUDGET EXCEEDED {violation}', file=sys.stderr)
+    print(f'Results written to {args.output}')
+    return 1 if violations else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Compare the column-projected attendance listing with the ORM path
+
+Fetches and serializes the newest 50, 500 and 5,000 attendance rows of one
+course twice: through Attendance ORM objects and to_dict() (one lazy User
+load per student), and through attendance_listing_query() and
+serialize_attendance_rows(), which the listing endpoints use.
+
+    cd backend
+    python -m benchmarks.attendance_listing --output attendance-listing.json
+"""
+import argparse
+import sys
+from .common import StatementCounter, create_benchmark_app, environment_info, measure, write_results
+
+ROW_COUNTS = (50, 500, 5000)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1, help='dataset scale (see generate_data.py)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--regenerate', action='store_true', help='rebuild the cached dataset')
+    parser.add_argument('--output', default='attendance-listing.json')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(args.scale, args.seed, regenerate=args.regenerate, name='attendance-listing')
+    from app.models import db, Attendance
+    from app.utils.serializers import attendance_listing_query, serialize_attendance_rows
+    with app.app_context():
+        course_id = db.session.query(Attendance.course_id).group_by(Attendance.course_id).order_by(
+            db.func.count().desc()
+        ).limit(1).scalar()
+        available = Attendance.query.filter_by(course_id=course_id).count()
+        counter = StatementCounter(db.engine)
+    if available < max(ROW_COUNTS):
+        print(f'Course {course_id} has only {available} attendance rows; use a larger --scale', file=sys.stderr)
+        return 1
+
+    order = (Attendance.date.desc(), Attendance.id.desc())
+
+    # Each call runs in a fresh app context, so no User is cached between calls
+    def orm(limit):
+        def run():
+            with app.app_context():
+                rows = Attendance.query.filter_by(course_id=course_id).order_by(*order).limit(limit)
+                assert len([record.to_dict() for record in rows]) == limit
+        return run
+
+    def lean(limit):
+        def run():
+            with app.app_context():
+                rows = attendance_listing_query().filter(Attendance.course_id == course_id).order_by(*order).limit(limit)
+                assert len(serialize_attendance_rows(rows)) == limit
+        return run
+
+    results = {}
+    for limit in ROW_COUNTS:
+        for name, path in (('orm', orm), ('lean', lean)):
+            result = results[f'{name}_{limit}'] = measure(path(limit), args.iterations, counter)
+            print(
+                f"{name:<5} {limit:>5} rows  p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+                f"sql {result['sql']:>4}  peak {result['peak_mb']:>7.2f}MB"
+            )
+
+    write_results(args.output, {
+        'benchmark': 'attendance_listing',
+        'scale': args.scale,
+        'seed': args.seed,
+        'course_id': course_id,
+        'environment': environment_info(),
+        'results': results
+    })
+    print(f'Results written to {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
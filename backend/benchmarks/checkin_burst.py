@@ -0,0 +1,113 @@
+"""Burst of QR check-ins against one course, direct vs coalesced writes
+
+Every enrolled student of one course (300 by default) checks in once with
+the same check-in token, from concurrent threads of test clients, first
+with CHECKIN_COALESCE off (one commit per request) and then on (batched
+upserts). Each mode runs in its own process on a fresh copy of the
+dataset, because the configuration is read at import time. Reports
+check-ins per second, latency, response codes and whether the attendance
+summary still matches the raw rows.
+
+    cd backend
+    python -m benchmarks.checkin_burst --threads 32 --output checkin-burst.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .common import BACKEND_DIR, environment_info, percentile, write_results
+
+def run_mode(args):
+    """Run the burst in this process and print the result as JSON"""
+    os.environ['CHECKIN_COALESCE'] = 'true' if args.mode == 'coalesce' else 'false'
+    from .common import create_benchmark_app
+    app = create_benchmark_app(
+        args.scale, args.seed, name=f'checkin-{args.mode}', students_per_course=args.students
+    )
+
+    from flask_jwt_extended import create_access_token
+    from app.models import db, Course, Enrollment
+    from app.utils.checkin_token import create_checkin_token
+    from app.utils.summary import verify_summary
+    with app.app_context():
+        course_id = db.session.query(Course.id).order_by(Course.id).limit(1).scalar()
+        headers = [
+            {'Authorization': f'Bearer {create_access_token(identity=str(student_id))}'}
+            for student_id, in db.session.query(Enrollment.student_id).filter_by(course_id=course_id)
+        ]
+        token = create_checkin_token(course_id)
+        db.session.remove()
+
+    def checkin(student_headers):
+        started = time.perf_counter()
+        response = app.test_client().post('/api/attendance/checkin', headers=student_headers, json={'token': token})
+        return response.status_code, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as executor:
+        responses = list(executor.map(checkin, headers))
+    elapsed = time.perf_counter() - started
+
+    codes = {}
+    for code, _ in responses:
+        codes[str(code)] = codes.get(str(code), 0) + 1
+    latencies = [latency for _, latency in responses]
+    with app.app_context():
+        mismatches = len(verify_summary())
+
+    print(json.dumps({
+        'checkins': len(responses),
+        'per_second': round(len(responses) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'max_ms': round(max(latencies), 2),
+        'status_codes': codes,
+        'summary_mismatches': mismatches
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--students', type=int, default=300, help='enrolled students checking in')
+    parser.add_argument('--threads', type=int, default=32, help='concurrent clients')
+    parser.add_argument('--output', default='checkin-burst.json')
+    parser.add_argument('--mode', choices=['direct', 'coalesce'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return 0
+
+    results = {}
+    for mode in ('direct', 'coalesce'):
+        command = [
+            sys.executable, '-m', 'benchmarks.checkin_burst', '--mode', mode,
+            '--scale', str(args.scale), '--seed', str(args.seed),
+            '--students', str(args.students), '--threads', str(args.threads)
+        ]
+        output = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout
+        result = results[mode] = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:<9} {result['per_second']:>7.1f} check-ins/s  p50 {result['p50_ms']:>8.2f}ms  "
+            f"p95 {result['p95_ms']:>8.2f}ms  codes {result['status_codes']}  "
+            f"summary mismatches {result['summary_mismatches']}"
+        )
+
+    write_results(args.output, {
+        'benchmark': 'checkin_burst',
+        'scale': args.scale,
+        'seed': args.seed,
+        'students': args.students,
+        'threads': args.threads,
+        'environment': environment_info(),
+        'results': results
+    })
+    print(f'Results written to {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Compare the compact check-in token with the JWT it replaced
+
+Mints and verifies check-in tokens both ways, then renders each payload as
+a PNG and an SVG QR code with the course QR renderer. The JWT is built as
+the QR endpoint used to build it: an access token of the course teacher
+with ``scope`` and ``course_id`` claims and a 10-minute expiry. Reports the
+payload size, QR version and median time of every step.
+
+    cd backend
+    python -m benchmarks.checkin_token --output checkin-token.json
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import timedelta
+from .common import create_benchmark_app, environment_info, write_results
+
+def median_us(fn, iterations):
+    """Median wall time of fn in microseconds"""
+    fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return round(statistics.median(samples), 1)
+
+def qr_version(data):
+    import qrcode
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.version
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1, help='dataset scale (see generate_data.py)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=1000, help='timed mints and verifications')
+    parser.add_argument('--render-iterations', type=int, default=30, help='timed QR renders')
+    parser.add_argument('--output', default='checkin-token.json')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(args.scale, args.seed, name='checkin-token')
+    from flask_jwt_extended import create_access_token, decode_token
+    from app.models import Course
+    from app.routes.courses import _render_qr_code
+    from app.utils.checkin_token import create_checkin_token, verify_checkin_token
+
+    with app.app_context():
+        course = Course.query.order_by(Course.id).first()
+        course_id, teacher_id = course.id, course.teacher_id
+
+        def mint_jwt():
+            return create_access_token(
+                identity=str(teacher_id),
+                additional_claims={'scope': 'checkin', 'course_id': course_id},
+                expires_delta=timedelta(minutes=10)
+            )
+
+        tokens = {'compact': create_checkin_token(course_id), 'jwt': mint_jwt()}
+        steps = {
+            'compact': (lambda: create_checkin_token(course_id), lambda: verify_checkin_token(tokens['compact'])),
+            'jwt': (mint_jwt, lambda: decode_token(tokens['jwt']))
+        }
+
+        results = {}
+        for name, (mint, verify) in steps.items():
+            token = tokens[name]
+            results[name] = {
+                'payload_chars': len(token),
+                'qr_version': qr_version(token),
+                'mint_us': median_us(mint, args.iterations),
+                'verify_us': median_us(verify, args.iterations),
+                'png_ms': round(median_us(lambda: _render_qr_code(token, 'png'), args.render_iterations) / 1000, 2),
+                'svg_ms': round(median_us(lambda: _render_qr_code(token, 'svg'), args.render_iterations) / 1000, 2)
+            }
+            result = results[name]
+            print(
+                f"{name:<8} {result['payload_chars']:>4} chars  QR v{result['qr_version']:<3} "
+                f"mint {result['mint_us']:>7.1f}us  verify {result['verify_us']:>7.1f}us  "
+                f"png {result['png_ms']:>6.2f}ms  svg {result['svg_ms']:>6.2f}ms"
+            )
+
+    write_results(args.output, {
+        'benchmark': 'checkin_token',
+        'environment': environment_info(),
+        'results': results
+    })
+    print(f'Results written to {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
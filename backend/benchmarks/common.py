@@ -0,0 +1,162 @@
+"""Shared helpers for the benchmark scripts
+
+Every benchmark runs against a copy of a dataset built by generate_data.py.
+Datasets are cached per scale/seed in the temp directory, so repeated runs
+only pay for generation once.
+"""
+import json
+import math
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+def dataset_path(scale, seed, **options):
+    suffix = ''.join(f'-{key}{value}' for key, value in sorted(options.items()))
+    return os.path.join(tempfile.gettempdir(), f'zitiacademy-bench-scale{scale:g}-seed{seed}{suffix}.db')
+
+def create_benchmark_app(scale=1, seed=42, regenerate=False, name='bench', **options):
+    """Create the app on a fresh working copy of the cached dataset
+
+    Extra options are passed on to generate_dataset. The database URL is
+    read from the environment when app.config is first imported, so this
+    must run before anything imports the app package.
+    """
+    cached = dataset_path(scale, seed, **options)
+    working = os.path.join(tempfile.gettempdir(), f'zitiacademy-{name}-work.db')
+    for path in (working, working + '-wal', working + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+    fresh = regenerate or not os.path.exists(cached)
+    if not fresh:
+        shutil.copyfile(cached, working)
+    os.environ['DATABASE_URL'] = f'sqlite:///{working}'
+
+    from app import create_app, upgrade_database
+    app = create_app()
+    upgrade_database(app)
+    if fresh:
+        from generate_data import generate_dataset
+        from app.models import db
+        with app.app_context():
+            started = time.perf_counter()
+            generate_dataset(scale=scale, seed=seed, log=lambda message: None, **options)
+            print(f'Generated scale {scale:g} dataset in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+            # Fold the WAL into the database file before it is copied;
+            # dispose() alone leaves a connection the session still holds
+            db.session.remove()
+            with db.engine.connect() as connection:
+                connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+            db.engine.dispose()
+        shutil.copyfile(working, cached)
+    return app
+
+class StatementCounter:
+    """Count the SQL statements executed on an engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def reset(self):
+        self.count = 0
+
+def percentile(samples, p):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def measure(fn, iterations, counter=None, warmup=1):
+    """Run fn repeatedly and summarise latency, SQL statements and memory
+
+    Latency percentiles come from the timed iterations and ``sql`` is the
+    most statements any single call executed. Peak memory is taken from one
+    extra call under tracemalloc, which is too slow to leave on while timing.
+    """
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    statements = 0
+    for _ in range(iterations):
+        if counter is not None:
+            counter.reset()
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+        if counter is not None:
+            statements = max(statements, counter.count)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'mean_ms': round(sum(latencies) / len(latencies), 2),
+        'peak_mb': round(peak / 1024 / 1024, 2)
+    }
+    if counter is not None:
+        result['sql'] = statements
+    return result
+
+def load_budgets(path):
+    with open(path) as f:
+        return json.load(f)
+
+def check_budgets(results, budgets):
+    """Compare results against budgets; returns a list of violation messages
+
+    Each entry maps a result field to its ceiling, e.g.
+    {"course_report": {"sql": 4, "p95_ms": 40}}.
+    """
+    violations = []
+    for name, limits in budgets.items():
+        result = results.get(name)
+        if result is None:
+            continue
+        for field, limit in limits.items():
+            if field in result and result[field] > limit:
+                violations.append(f'{name}: {field} {result[field]} exceeds budget {limit}')
+    return violations
+
+def environment_info():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'commit': commit,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+def write_results(path, payload):
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
+        f.write('\n')
@@ -0,0 +1,139 @@
+"""Benchmark the heavy API endpoints against a generated dataset
+
+Drives each endpoint through the Flask test client and records p50/p95
+latency, the SQL statement count per request and peak memory. Results are
+written as JSON and checked against benchmarks/budgets.json; any budget
+overrun makes the run exit non-zero.
+
+    cd backend
+    python -m benchmarks.endpoints --scale 1 --output benchmark-results.json
+"""
+import argparse
+import itertools
+import os
+import sys
+from .common import (
+    StatementCounter, check_budgets, create_benchmark_app, environment_info,
+    load_budgets, measure, write_results
+)
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+
+def build_scenarios(app, client):
+    """Return {name: callable} for every benchmarked request"""
+    from flask_jwt_extended import create_access_token
+    from app.models import db, User, Course, Enrollment, Attendance
+    from app.utils.checkin_token import create_checkin_token
+
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').first()
+        course = Course.query.order_by(Course.id).first()
+        roster = [student_id for student_id, in db.session.query(Enrollment.student_id).filter_by(
+            course_id=course.id
+        ).order_by(Enrollment.student_id)]
+        session_date = db.session.query(db.func.max(Attendance.date)).filter_by(course_id=course.id).scalar()
+        admin_headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+        student_headers = [
+            {'Authorization': f'Bearer {create_access_token(identity=str(student_id))}'}
+            for student_id in roster
+        ]
+        checkin_token = create_checkin_token(course.id)
+
+    report_cache = app.extensions['report_cache']
+
+    def get(url, headers=admin_headers, cached=True):
+        def run():
+            if not cached:
+                report_cache.clear()
+            response = client.get(url, headers=headers)
+            # Exports stream, so read the whole body inside the timing
+            response.get_data()
+            assert response.status_code == 200, (url, response.status_code)
+        return run
+
+    statuses = itertools.cycle(['present', 'late', 'absent', 'excused'])
+
+    def bulk_mark():
+        status = next(statuses)
+        response = client.post('/api/attendance/bulk', headers=admin_headers, json={'records': [
+            {'student_id': student_id, 'course_id': course.id, 'date': session_date.isoformat(), 'status': status}
+            for student_id in roster
+        ]})
+        assert response.status_code in (200, 201), response.status_code
+
+    students = itertools.cycle(student_headers)
+
+    def checkin():
+        response = client.post('/api/attendance/checkin', headers=next(students), json={'token': checkin_token})
+        assert response.status_code == 200, response.status_code
+
+    return {
+        # Reports are measured with an empty cache, plus the cache-hit path
+        'course_report': get(f'/api/reports/course/{course.id}', cached=False),
+        'course_report_filtered': get(
+            f'/api/reports/course/{course.id}?start_date={session_date.replace(day=1).isoformat()}'
+            f'&end_date={session_date.isoformat()}',
+            cached=False
+        ),
+        'course_report_cached': get(f'/api/reports/course/{course.id}'),
+        'course_timeseries': get(f'/api/reports/course/{course.id}/timeseries', cached=False),
+        'course_timeseries_cached': get(f'/api/reports/course/{course.id}/timeseries'),
+        'student_report': get(f'/api/reports/student/{roster[0]}', cached=False),
+        'student_report_cached': get(f'/api/reports/student/{roster[0]}'),
+        'export_csv': get(f'/api/reports/export/{course.id}?format=csv'),
+        'export_xlsx': get(f'/api/reports/export/{course.id}?format=xlsx'),
+        'bulk_mark': bulk_mark,
+        'checkin': checkin,
+        'course_list': get('/api/courses?per_page=100'),
+        'attendance_listing': get(f'/api/attendance/course/{course.id}?per_page=100')
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1, help='dataset scale (see generate_data.py)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=30, help='timed requests per endpoint')
+    parser.add_argument('--only', action='append', help='run only the named scenario (repeatable)')
+    parser.add_argument('--regenerate', action='store_true', help='rebuild the cached dataset')
+    parser.add_argument('--budgets', default=BUDGETS_PATH)
+    parser.add_argument('--output', default='benchmark-results.json')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(args.scale, args.seed, regenerate=args.regenerate, name='endpoints')
+    client = app.test_client()
+    scenarios = build_scenarios(app, client)
+
+    with app.app_context():
+        from app.models import db
+        counter = StatementCounter(db.engine)
+
+    results = {}
+    for name, fn in scenarios.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = measure(fn, args.iterations, counter)
+        result = results[name]
+        print(
+            f"{name:<24} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+            f"sql {result['sql']:>4}  peak {result['peak_mb']:>7.2f}MB"
+        )
+
+    # Budgets are calibrated for the default dataset; other scales only report
+    budgets = load_budgets(args.budgets)
+    violations = check_budgets(results, budgets['endpoints']) if args.scale == budgets['scale'] else []
+    write_results(args.output, {
+        'benchmark': 'endpoints',
+        'scale': args.scale,
+        'seed': args.seed,
+        'environment': environment_info(),
+        'results': results,
+        'violations': violations
+    })
+
+    for violation in violations:
+        print(f'BUDGET EXCEEDED {violation}', file=sys.stderr)
+    print(f'Results written to {args.output}')
+    return 1 if violations else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""HTTP load test: the development server against gunicorn
+
+Starts each server on a copy of a generated dataset, then drives a mix of
+read endpoints (course report, student report, course list, attendance
+listing, health) from concurrent keep-alive clients for a fixed duration and
+reports throughput and latency.
+
+    cd backend
+    python -m benchmarks.load_test --duration 20 --clients 16 --output load-test.json
+"""
+import argparse
+import http.client
+import itertools
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from .common import BACKEND_DIR, create_benchmark_app, environment_info, percentile, write_results
+
+SERVERS = {
+    'dev': [sys.executable, 'run.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', '/dev/null', 'run:app']
+}
+
+def wait_until_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not become ready')
+
+def drive(port, urls, headers, clients, duration):
+    deadline = time.monotonic() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        mine = []
+        failed = 0
+        for url in itertools.islice(itertools.cycle(urls), offset, None):
+            if time.monotonic() >= deadline:
+                break
+            started = time.perf_counter()
+            try:
+                connection.request('GET', url, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            mine.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'requests': len(latencies),
+        'per_second': round(len(latencies) / duration, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'errors': errors[0]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--duration', type=float, default=20, help='seconds per server')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent connections')
+    parser.add_argument('--port', type=int, default=5001, help='port run.py listens on')
+    parser.add_argument('--server', action='append', choices=sorted(SERVERS), help='servers to test (default: all)')
+    parser.add_argument('--output', default='load-test.json')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(args.scale, args.seed, name='load')
+    from flask_jwt_extended import create_access_token
+    from app.models import db, User, Course, Enrollment
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').first()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+        course_ids = [id for id, in db.session.query(Course.id).order_by(Course.id).limit(10)]
+        student_ids = [id for id, in db.session.query(Enrollment.student_id).filter(
+            Enrollment.course_id.in_(course_ids)
+        ).distinct().limit(10)]
+        database_url = app.config['SQLALCHEMY_DATABASE_URI']
+        db.engine.dispose()
+
+    urls = ['/api/health', '/api/courses?per_page=50']
+    urls += [f'/api/reports/course/{course_id}' for course_id in course_ids]
+    urls += [f'/api/reports/student/{student_id}' for student_id in student_ids]
+    urls += [f'/api/attendance/course/{course_id}?per_page=50' for course_id in course_ids]
+
+    env = {**os.environ, 'DATABASE_URL': database_url, 'PORT': str(args.port)}
+    results = {}
+    for name in args.server or sorted(SERVERS):
+        server = subprocess.Popen(
+            SERVERS[name], cwd=BACKEND_DIR, env=env, start_new_session=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_ready(args.port)
+            drive(args.port, urls, headers, args.clients, min(3, args.duration))  # warm up
+            results[name] = drive(args.port, urls, headers, args.clients, args.duration)
+        finally:
+            # The dev server's reloader forks, so stop the whole process group
+            os.killpg(server.pid, signal.SIGTERM)
+            server.wait()
+        result = results[name]
+        print(
+            f"{name:<9} {result['per_second']:>8.1f} req/s  p50 {result['p50_ms']:>7.2f}ms  "
+            f"p95 {result['p95_ms']:>7.2f}ms  p99 {result['p99_ms']:>7.2f}ms  errors {result['errors']}"
+        )
+
+    write_results(args.output, {
+        'benchmark': 'load_test',
+        'scale': args.scale,
+        'seed': args.seed,
+        'duration': args.duration,
+        'clients': args.clients,
+        'environment': environment_info(),
+        'results': results
+    })
+    print(f'Results written to {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Login throughput versus request threads and hashing processes
+
+Students log in through POST /api/auth/login from concurrent test clients
+for a fixed duration per configuration. Passwords are first checked in the
+request threads, as the app does, with 1, 2, 4 and 8 threads. Then, at the
+largest thread count, they are checked in a process pool of 1, 2 and 4
+workers for comparison. Every student is given a hash at --rounds first, so
+no login re-hashes. Reports logins per second and latency for each
+configuration.
+
+    cd backend
+    python -m benchmarks.login_throughput --output login-throughput.json
+"""
+import argparse
+import itertools
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from .common import create_benchmark_app, environment_info, percentile, write_results
+
+THREADS = (1, 2, 4, 8)
+POOL_WORKERS = (1, 2, 4)
+
+def _check(password, password_hash):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+def drive(app, emails, password, threads, duration):
+    """Log in from ``threads`` clients for ``duration`` seconds"""
+    deadline = time.monotonic() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def client(offset):
+        test_client = app.test_client()
+        for email in itertools.islice(itertools.cycle(emails), offset, None):
+            if time.monotonic() >= deadline:
+                break
+            started = time.perf_counter()
+            response = test_client.post('/api/auth/login', json={'email': email, 'password': password})
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 200:
+                    errors[0] += 1
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return {
+        'logins': len(latencies),
+        'per_second': round(len(latencies) / duration, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'errors': errors[0]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1, help='dataset scale (see generate_data.py)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost of the stored hashes')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per configuration')
+    parser.add_argument('--output', default='login-throughput.json')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(args.scale, args.seed, name='login-throughput')
+    from generate_data import DEFAULT_PASSWORD
+    from app.models import db, User
+    hasher = app.extensions['password_hasher']
+    hasher.rounds = args.rounds
+    with app.app_context():
+        User.query.filter_by(role='student').update({'password_hash': hasher.hash(DEFAULT_PASSWORD)})
+        db.session.commit()
+        emails = [email for email, in db.session.query(User.email).filter_by(role='student').limit(200)]
+
+    results = {}
+
+    def report(name, result):
+        results[name] = result
+        print(
+            f"{name:<20} {result['per_second']:>6.1f} logins/s  p50 {result['p50_ms']:>8.2f}ms  "
+            f"p95 {result['p95_ms']:>8.2f}ms  errors {result['errors']}"
+        )
+
+    for threads in THREADS:
+        report(f'threads_{threads}', drive(app, emails, DEFAULT_PASSWORD, threads, args.duration))
+
+    for workers in POOL_WORKERS:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hasher.check = lambda password_hash, password: pool.submit(_check, password, password_hash).result()
+            try:
+                report(f'pool_{workers}', drive(app, emails, DEFAULT_PASSWORD, max(THREADS), args.duration))
+            finally:
+                del hasher.check
+
+    write_results(args.output, {
+        'benchmark': 'login_throughput',
+        'scale': args.scale,
+        'seed': args.seed,
+        'rounds': args.rounds,
+        'duration': args.duration,
+        'environment': environment_info(),
+        'results': results
+    })
+    print(f'Results written to {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
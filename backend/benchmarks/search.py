@@ -0,0 +1,97 @@
+"""Benchmark user, course and roster search at 100k users
+
+Builds a users-heavy dataset (100k students, 4k courses of 25 students at the
+default scale) and times the search endpoints through the
+Flask test client, next to the previous ILIKE substring filter on the same
+terms. Budgets are the "search" entry of benchmarks/budgets.json.
+
+    cd backend
+    python -m benchmarks.search --output search.json
+"""
+import argparse
+import os
+import sys
+from .common import (
+    StatementCounter, check_budgets, create_benchmark_app, environment_info,
+    load_budgets, measure, write_results
+)
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+
+# name -> (url, ILIKE baseline term or None)
+SCENARIOS = {
+    'users_exact': ('/api/users?search=student54321', 'student54321'),
+    'users_prefix': ('/api/users?search=student12', 'student12'),
+    'users_email': ('/api/users?search=student777@zitiacademy.com', 'student777@zitiacademy.com'),
+    'users_email_partial': ('/api/users?search=student777@zit', 'student777@zit'),
+    'users_broad': ('/api/users?search=stu', 'stu'),
+    'courses_prefix': ('/api/courses?search=C001', None),
+    'roster': ('/api/courses/{course_id}/students?search=student12', None)
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=200, help='dataset scale; 200 gives 100k students')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--regenerate', action='store_true', help='rebuild the cached dataset')
+    parser.add_argument('--budgets', default=BUDGETS_PATH)
+    parser.add_argument('--output', default='search.json')
+    args = parser.parse_args()
+
+    app = create_benchmark_app(
+        args.scale, args.seed, regenerate=args.regenerate, name='search', students_per_course=25, sessions=1
+    )
+    client = app.test_client()
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import or_
+    from app.models import db, User, Course
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').first()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+        course_id = db.session.query(Course.id).order_by(Course.id).limit(1).scalar()
+        counter = StatementCounter(db.engine)
+
+    def endpoint(url):
+        def run():
+            response = client.get(url.format(course_id=course_id), headers=headers)
+            assert response.status_code == 200, (url, response.status_code)
+        return run
+
+    def ilike(term):
+        # The filter the users endpoint used before the search index
+        def run():
+            with app.app_context():
+                User.query.filter(
+                    or_(User.username.ilike(f'%{term}%'), User.email.ilike(f'%{term}%'))
+                ).order_by(User.created_at.desc()).paginate(page=1, per_page=20, error_out=False)
+        return run
+
+    results = {}
+    baselines = {}
+    for name, (url, baseline) in SCENARIOS.items():
+        results[name] = measure(endpoint(url), args.iterations, counter)
+        line = f"{name:<20} p50 {results[name]['p50_ms']:>7.2f}ms  p95 {results[name]['p95_ms']:>7.2f}ms"
+        if baseline:
+            baselines[name] = measure(ilike(baseline), args.iterations)
+            line += f"   ILIKE p50 {baselines[name]['p50_ms']:>7.2f}ms  p95 {baselines[name]['p95_ms']:>7.2f}ms"
+        print(line)
+
+    budgets = load_budgets(args.budgets)
+    violations = check_budgets(results, budgets['search']) if args.scale == 200 else []
+    write_results(args.output, {
+        'benchmark': 'search',
+        'scale': args.scale,
+        'seed': args.seed,
+        'environment': environment_info(),
+        'results': results,
+        'ilike_baseline': baselines,
+        'violations': violations
+    })
+    for violation in violations:
+        print(f'BUDGET EXCEEDED {violation}', file=sys.stderr)
+    print(f'Results written to {args.output}')
+    return 1 if violations else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Compare SQLite production mode against the default journal under concurrency
+
+Reader threads stream CSV exports and fetch course reports while writer
+threads bulk-mark attendance, first with SQLITE_PRODUCTION_MODE off
+(rollback journal) and then on (WAL and pragmas). Each mode runs in its own
+process because the configuration is read at import time.
+
+    cd backend
+    python -m benchmarks.sqlite_concurrency --duration 10 --output sqlite-concurrency.json
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from .common import BACKEND_DIR, environment_info, percentile, write_results
+
+def run_mode(args):
+    """Run the mixed workload in this process and print the result as JSON"""
+    os.environ['SQLITE_PRODUCTION_MODE'] = 'true' if args.mode == 'on' else 'false'
+    from .common import create_benchmark_app
+    app = create_benchmark_app(args.scale, args.seed, name=f'sqlite-{args.mode}')
+
+    from flask_jwt_extended import create_access_token
+    from app.models import db, User, Course, Enrollment, Attendance
+    with app.app_context():
+        if args.mode == 'off':
+            # The cached dataset may already be in WAL mode; journal_mode persists in the file
+            with db.engine.connect() as connection:
+                connection.exec_driver_sql('PRAGMA journal_mode=DELETE')
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+        admin = User.query.filter_by(role='admin').first()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+        course_ids = [id for id, in db.session.query(Course.id).order_by(Course.id)]
+        rosters = {
+            course_id: [student_id for student_id, in db.session.query(Enrollment.student_id).filter_by(
+                course_id=course_id
+            )]
+            for course_id in course_ids[:args.writers]
+        }
+        session_date = db.session.query(db.func.max(Attendance.date)).scalar().isoformat()
+        db.session.remove()
+
+    deadline = time.monotonic() + args.duration
+    write_latencies = []
+    read_latencies = []
+    errors = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+
+    def reader(offset):
+        client = app.test_client()
+        courses = itertools.cycle(course_ids[offset::args.readers] or course_ids)
+        while time.monotonic() < deadline:
+            course_id = next(courses)
+            for url in (f'/api/reports/export/{course_id}?format=csv', f'/api/reports/course/{course_id}'):
+                started = time.perf_counter()
+                response = client.get(url, headers=headers)
+                response.get_data()
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    read_latencies.append(elapsed)
+                    if response.status_code != 200:
+                        errors['read'] += 1
+
+    def writer(course_id):
+        client = app.test_client()
+        statuses = itertools.cycle(['present', 'late', 'absent', 'excused'])
+        while time.monotonic() < deadline:
+            status = next(statuses)
+            started = time.perf_counter()
+            response = client.post('/api/attendance/bulk', headers=headers, json={'records': [
+                {'student_id': student_id, 'course_id': course_id, 'date': session_date, 'status': status}
+                for student_id in rosters[course_id]
+            ]})
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                write_latencies.append(elapsed)
+                if response.status_code not in (200, 201):
+                    errors['write'] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(course_id,)) for course_id in rosters]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def stats(latencies):
+        if not latencies:
+            return {'requests': 0}
+        return {
+            'requests': len(latencies),
+            'per_second': round(len(latencies) / args.duration, 1),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'max_ms': round(max(latencies), 2)
+        }
+
+    print(json.dumps({
+        'journal_mode': journal_mode,
+        'reads': {**stats(read_latencies), 'errors': errors['read']},
+        'writes': {**stats(write_latencies), 'errors': errors['write']}
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--duration', type=float, default=10, help='seconds per mode')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--output', default='sqlite-concurrency.json')
+    parser.add_argument('--mode', choices=['on', 'off'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return 0
+
+    results = {}
+    for mode in ('off', 'on'):
+        command = [
+            sys.executable, '-m', 'benchmarks.sqlite_concurrency', '--mode', mode,
+            '--scale', str(args.scale), '--seed', str(args.seed), '--duration', str(args.duration),
+            '--readers', str(args.readers), '--writers', str(args.writers)
+        ]
+        output = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+        reads, writes = results[mode]['reads'], results[mode]['writes']
+        print(
+            f"production mode {mode:<3} ({results[mode]['journal_mode']}): "
+            f"writes {writes['per_second']}/s p95 {writes['p95_ms']}ms max {writes['max_ms']}ms "
+            f"errors {writes['errors']} | reads {reads['per_second']}/s p95 {reads['p95_ms']}ms "
+            f"errors {reads['errors']}"
+        )
+
+    write_results(args.output, {
+        'benchmark': 'sqlite_concurrency',
+        'scale': args.scale,
+        'seed': args.seed,
+        'duration': args.duration,
+        'readers': args.readers,
+        'writers': args.writers,
+        'environment': environment_info(),
+        'results': results
+    })
+    print(f'Results written to {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Measure application startup: import time, create_app and the first request
+
+Each sample runs in a fresh interpreter so nothing is already imported or
+cached. Reports medians, and which heavy optional dependencies (openpyxl,
+qrcode, PIL, dateutil, alembic, numpy) were imported just to serve the first
+requests. Budgets are the "startup" entry of benchmarks/budgets.json.
+
+    cd backend
+    python -m benchmarks.startup --runs 7 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from .common import BACKEND_DIR, check_budgets, environment_info, load_budgets, write_results
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+
+HEAVY_MODULES = ('openpyxl', 'qrcode', 'PIL', 'dateutil', 'alembic', 'numpy')
+
+# Runs in the child interpreter; the database already has its schema
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+client = app.test_client()
+client.get('/api/health')
+first = time.perf_counter()
+client.post('/api/auth/login', json={'email': 'nobody@example.com', 'password': 'x'})
+login = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (first - created) * 1000,
+    'first_db_request_ms': (login - first) * 1000,
+    'total_ms': (login - started) * 1000,
+    'heavy_modules': sorted({name.split('.')[0] for name in sys.modules} & set(%r))
+}))
+''' % (HEAVY_MODULES,)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budgets', default=BUDGETS_PATH)
+    parser.add_argument('--output', default='startup.json')
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.gettempdir(), 'zitiacademy-startup.db')
+    if os.path.exists(database):
+        os.remove(database)
+    env = {**os.environ, 'DATABASE_URL': f'sqlite:///{database}'}
+    subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'run.py', 'db', 'upgrade'],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True
+    )
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    result = {
+        field: round(statistics.median(sample[field] for sample in samples), 1)
+        for field in ('import_ms', 'create_app_ms', 'first_request_ms', 'first_db_request_ms', 'total_ms')
+    }
+    result['heavy_modules'] = samples[-1]['heavy_modules']
+    result['heavy_modules_loaded'] = len(result['heavy_modules'])
+    for field, value in result.items():
+        print(f'{field:<22} {value}')
+
+    violations = check_budgets({'startup': result}, {'startup': load_budgets(args.budgets)['startup']})
+    write_results(args.output, {
+        'benchmark': 'startup',
+        'runs': args.runs,
+        'environment': environment_info(),
+        'results': result,
+        'violations': violations
+    })
+    for violation in violations:
+        print(f'BUDGET EXCEEDED {violation}', file=sys.stderr)
+    print(f'Results written to {args.output}')
+    return 1 if violations else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
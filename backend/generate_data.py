@@ -0,0 +1,193 @@
+"""Generate a large, reproducible synthetic dataset for load and performance testing
+
+At scale 1 this creates 500 students, 20 courses with 100 students each and
+100 sessions per course (200k attendance rows). Everything grows linearly
+with --scale, so --scale 100 gives 50k students, 2k courses and 20M rows.
+
+    python generate_data.py --scale 10 --seed 7
+    python generate_data.py --distribution present=0.6,late=0.2,absent=0.15,excused=0.05
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, time as clock, timedelta
+from flask import current_app
+from app.models import db, User, Course, Enrollment, Attendance, AttendanceSummary
+
+DEFAULT_DISTRIBUTION = {'present': 0.75, 'late': 0.10, 'absent': 0.10, 'excused': 0.05}
+DEFAULT_PASSWORD = 'password123'
+
+def parse_distribution(value):
+    """Parse 'present=0.7,late=0.1,...' into a status -> weight dict"""
+    distribution = {}
+    for part in value.split(','):
+        status, _, weight = part.partition('=')
+        status = status.strip()
+        if status not in DEFAULT_DISTRIBUTION:
+            raise argparse.ArgumentTypeError(f'Unknown status: {status}')
+        distribution[status] = float(weight)
+    return distribution
+
+def _session_dates(start, count):
+    """The first `count` weekdays on or after `start`"""
+    dates = []
+    day = start
+    while len(dates) < count:
+        if day.weekday() < 5:
+            dates.append(day)
+        day += timedelta(days=1)
+    return dates
+
+def _insert_chunked(table, rows, chunk_size):
+    """Insert an iterable of row dicts with one executemany per chunk"""
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(table.insert(), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(table.insert(), chunk)
+        count += len(chunk)
+    return count
+
+def generate_dataset(scale=1, seed=42, students_per_course=100, sessions=100,
+                     distribution=None, start_date=date(2024, 9, 2), chunk_size=10000,
+                     password=DEFAULT_PASSWORD, log=print):
+    """Replace the database contents with a synthetic dataset
+
+    Must run inside an application context. Returns the created row counts.
+    """
+    rnd = random.Random(seed)
+    distribution = distribution or DEFAULT_DISTRIBUTION
+    statuses = list(distribution)
+    weights = [distribution[status] for status in statuses]
+
+    n_students = int(500 * scale)
+    n_courses = max(1, int(20 * scale))
+    n_teachers = max(1, n_courses // 10)
+    students_per_course = min(students_per_course, n_students)
+    created_at = datetime.combine(start_date, clock(8, 0))
+
+    log('Clearing existing data...')
+    for model in (AttendanceSummary, Attendance, Enrollment, Course, User):
+        db.session.execute(model.__table__.delete())
+
+    # bcrypt is deliberately slow; every generated user shares one hash
+    password_hash = current_app.extensions['password_hasher'].hash(password)
+
+    log(f'Creating {n_students} students and {n_teachers} teachers...')
+    users = [{'username': 'admin', 'email': 'admin@zitiacademy.com', 'role': 'admin'}]
+    users += [
+        {'username': f'teacher{i}', 'email': f'teacher{i}@zitiacademy.com', 'role': 'teacher'}
+        for i in range(1, n_teachers + 1)
+    ]
+    users += [
+        {'username': f'student{i}', 'email': f'student{i}@zitiacademy.com', 'role': 'student'}
+        for i in range(1, n_students + 1)
+    ]
+    for user in users:
+        user.update(password_hash=password_hash, created_at=created_at)
+    _insert_chunked(User.__table__, users, chunk_size)
+
+    teacher_ids = [id for id, in db.session.query(User.id).filter_by(role='teacher').order_by(User.id)]
+    student_ids = [id for id, in db.session.query(User.id).filter_by(role='student').order_by(User.id)]
+
+    log(f'Creating {n_courses} courses...')
+    semesters = ['Fall', 'Spring', 'Summer']
+    _insert_chunked(Course.__table__, (
+        {
+            'name': f'Course {i}',
+            'code': f'C{i:05d}',
+            'description': f'Synthetic course {i}',
+            'teacher_id': teacher_ids[i % n_teachers],
+            'semester': semesters[i % len(semesters)],
+            'year': start_date.year,
+            'created_at': created_at
+        }
+        for i in range(1, n_courses + 1)
+    ), chunk_size)
+    course_ids = [id for id, in db.session.query(Course.id).order_by(Course.id)]
+
+    log(f'Enrolling {students_per_course} students per course...')
+    rosters = {course_id: sorted(rnd.sample(student_ids, students_per_course)) for course_id in course_ids}
+    _insert_chunked(Enrollment.__table__, (
+        {'student_id': student_id, 'course_id': course_id, 'enrolled_at': created_at}
+        for course_id, roster in rosters.items()
+        for student_id in roster
+    ), chunk_size)
+
+    dates = _session_dates(start_date, sessions)
+    log(f'Generating {n_courses * students_per_course * len(dates)} attendance records...')
+
+    def attendance_rows():
+        for course_id, roster in rosters.items():
+            teacher_id = teacher_ids[(course_id - course_ids[0] + 1) % n_teachers]
+            for day in dates:
+                session_start = datetime.combine(day, clock(9, 0))
+                for student_id, status in zip(roster, rnd.choices(statuses, weights, k=len(roster))):
+                    check_in_time = None
+                    if status == 'present':
+                        check_in_time = session_start + timedelta(seconds=rnd.randrange(600))
+                    elif status == 'late':
+                        check_in_time = session_start + timedelta(seconds=600 + rnd.randrange(1800))
+                    yield {
+                        'student_id': student_id,
+                        'course_id': course_id,
+                        'date': day,
+                        'status': status,
+                        'check_in_time': check_in_time,
+                        'notes': None,
+                        'marked_by': teacher_id,
+                        'created_at': session_start
+                    }
+
+    attendance_count = _insert_chunked(Attendance.__table__, attendance_rows(), chunk_size)
+
+    log('Building attendance summaries...')
+    from app.utils.summary import rebuild_summary
+    db.session.commit()
+    rebuild_summary()
+
+    return {
+        'users': len(users),
+        'courses': n_courses,
+        'enrollments': n_courses * students_per_course,
+        'attendance': attendance_count
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1, help='dataset size multiplier (default: 1)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (default: 42)')
+    parser.add_argument('--students-per-course', type=int, default=100)
+    parser.add_argument('--sessions', type=int, default=100, help='class sessions per course')
+    parser.add_argument('--distribution', type=parse_distribution, default=DEFAULT_DISTRIBUTION,
+                        help='status weights, e.g. present=0.75,late=0.1,absent=0.1,excused=0.05')
+    parser.add_argument('--start-date', type=date.fromisoformat, default=date(2024, 9, 2))
+    parser.add_argument('--chunk-size', type=int, default=10000, help='rows per bulk insert')
+    args = parser.parse_args()
+
+    from app import create_app, upgrade_database
+    app = create_app()
+    upgrade_database(app)
+    with app.app_context():
+        started = time.perf_counter()
+        counts = generate_dataset(
+            scale=args.scale,
+            seed=args.seed,
+            students_per_course=args.students_per_course,
+            sessions=args.sessions,
+            distribution=args.distribution,
+            start_date=args.start_date,
+            chunk_size=args.chunk_size
+        )
+        print(f'\n=== Generated in {time.perf_counter() - started:.1f}s ===')
+        for name, count in counts.items():
+            print(f'{name}: {count}')
+        print(f'All users share the password: {DEFAULT_PASSWORD}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Production server configuration
+
+    gunicorn -c gunicorn.conf.py run:app
+
+Worker and thread counts follow the CPU count and can be overridden with
+WEB_CONCURRENCY and GUNICORN_THREADS. The app is preloaded in the master and
+the schema is upgraded there once, before any worker is forked, instead of
+in every worker. Send SIGHUP for a graceful reload: new workers start and old
+ones finish their in-flight requests before exiting.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Import the app once in the master so workers share its memory pages
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Graceful restarts: recycle workers periodically (jittered so they do not
+# all restart together) and give in-flight requests time to finish
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+# Exports of large courses can take a while to stream
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+# Keep connections from the reverse proxy open between requests
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+def on_starting(server):
+    """Upgrade the database schema once, in the master process"""
+    from app import create_app, upgrade_database
+    from app.models import db
+
+    app = create_app()
+    upgrade_database(app)
+    with app.app_context():
+        db.engine.dispose()
+
+def post_fork(server, worker):
+    """Drop any database connections a preloaded app holds in the master"""
+    if not server.cfg.preload_app:
+        return
+    from app.models import db
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,91 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 09:00:00
+
+Databases created by the old ``db.create_all()`` call already have these
+tables, so each one is only created when it is missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password_hash', sa.String(length=255), nullable=False),
+            sa.Column('role', sa.String(length=20), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username')
+        )
+
+    if 'courses' not in existing:
+        op.create_table(
+            'courses',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=200), nullable=False),
+            sa.Column('code', sa.String(length=50), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('teacher_id', sa.Integer(), nullable=False),
+            sa.Column('semester', sa.String(length=20), nullable=True),
+            sa.Column('year', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['teacher_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('code', 'semester', 'year', name='_course_semester_uc')
+        )
+
+    if 'enrollments' not in existing:
+        op.create_table(
+            'enrollments',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('course_id', sa.Integer(), nullable=False),
+            sa.Column('enrolled_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+            sa.ForeignKeyConstraint(['student_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('student_id', 'course_id', name='_student_course_uc')
+        )
+
+    if 'attendance' not in existing:
+        op.create_table(
+            'attendance',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=False),
+            sa.Column('course_id', sa.Integer(), nullable=False),
+            sa.Column('date', sa.Date(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('check_in_time', sa.DateTime(), nullable=True),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('marked_by', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+            sa.ForeignKeyConstraint(['marked_by'], ['users.id']),
+            sa.ForeignKeyConstraint(['student_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('student_id', 'course_id', 'date', name='_student_course_date_uc')
+        )
+
+
+def downgrade():
+    op.drop_table('attendance')
+    op.drop_table('enrollments')
+    op.drop_table('courses')
+    op.drop_table('users')
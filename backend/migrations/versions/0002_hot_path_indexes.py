@@ -0,0 +1,30 @@
+"""Indexes for attendance, enrollment and course hot paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_attendance_course_date_status', 'attendance', ['course_id', 'date', 'status'])
+    op.create_index('ix_attendance_student_date', 'attendance', ['student_id', 'date'])
+    op.create_index('ix_enrollments_course_id', 'enrollments', ['course_id'])
+    op.create_index('ix_courses_teacher_id', 'courses', ['teacher_id'])
+
+
+def downgrade():
+    op.drop_index('ix_courses_teacher_id', table_name='courses')
+    op.drop_index('ix_enrollments_course_id', table_name='enrollments')
+    op.drop_index('ix_attendance_student_date', table_name='attendance')
+    op.drop_index('ix_attendance_course_date_status', table_name='attendance')
@@ -0,0 +1,51 @@
+"""Attendance summary table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'attendance_summary',
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('present', sa.Integer(), nullable=False),
+        sa.Column('late', sa.Integer(), nullable=False),
+        sa.Column('absent', sa.Integer(), nullable=False),
+        sa.Column('excused', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('student_id', 'course_id')
+    )
+    op.create_index('ix_attendance_summary_course_id', 'attendance_summary', ['course_id'])
+
+    # Backfill from existing attendance history
+    op.execute("""
+        INSERT INTO attendance_summary (student_id, course_id, present, late, absent, excused, total)
+        SELECT student_id, course_id,
+               SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'excused' THEN 1 ELSE 0 END),
+               COUNT(id)
+        FROM attendance
+        GROUP BY student_id, course_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_attendance_summary_course_id', table_name='attendance_summary')
+    op.drop_table('attendance_summary')
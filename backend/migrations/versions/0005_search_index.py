@@ -0,0 +1,76 @@
+"""Full-text search index for users and courses
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 14:00:00
+
+SQLite only: FTS5 tables over users(username, email) and courses(name,
+code), read through to the base tables and kept in sync by triggers, so
+every write path (ORM, Core bulk inserts, raw SQL) updates the index. Other
+databases keep searching with ILIKE.
+
+Migrations run with render_as_batch=True (app/__init__.py), so a later
+batch_alter_table on users or courses copies the table into a new one and
+drops these triggers without an error, leaving the index stale. Such a
+migration must recreate the triggers and rebuild the index as below;
+`flask search verify` reports missing triggers.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# index name -> (base table, indexed columns, bm25 column weights)
+INDEXES = {
+    'users_fts': ('users', ('username', 'email'), '2.0, 1.0'),
+    'courses_fts': ('courses', ('code', 'name'), '2.0, 1.0')
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for index, (base, columns, weights) in INDEXES.items():
+        names = ', '.join(columns)
+        new = ', '.join(f'new.{name}' for name in columns)
+        old = ', '.join(f'old.{name}' for name in columns)
+        # Prefix indexes make 2-4 character prefix queries index lookups
+        op.execute(f"""
+            CREATE VIRTUAL TABLE {index} USING fts5(
+                {names}, content='{base}', content_rowid='id',
+                tokenize='unicode61', prefix='2 3 4'
+            )
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {index}_ai AFTER INSERT ON {base} BEGIN
+                INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {index}_ad AFTER DELETE ON {base} BEGIN
+                INSERT INTO {index} ({index}, rowid, {names}) VALUES ('delete', old.id, {old});
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {index}_au AFTER UPDATE OF {names} ON {base} BEGIN
+                INSERT INTO {index} ({index}, rowid, {names}) VALUES ('delete', old.id, {old});
+                INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new});
+            END
+        """)
+        op.execute(f"INSERT INTO {index} ({index}, rank) VALUES ('rank', 'bm25({weights})')")
+        op.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for index, (base, columns, weights) in INDEXES.items():
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {index}_{suffix}')
+        op.execute(f'DROP TABLE IF EXISTS {index}')
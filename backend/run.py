@@ -1,6 +1,7 @@
-from app import create_app
+from app import create_app, upgrade_database
 
 app = create_app()
 
 if __name__ == '__main__':
+    upgrade_database(app)
     app.run(host='0.0.0.0', port=5001, debug=True)
\ No newline at end of file
@@ -1,14 +1,17 @@
 """Seed database with sample data for development"""
-from app import create_app
-from app.models import db, User, Course, Enrollment, Attendance
+from app import create_app, upgrade_database
+from app.models import db, User, Course, Enrollment, Attendance, AttendanceSummary
+from app.utils.summary import rebuild_summary
 from datetime import date, timedelta
 import random
 
 app = create_app()
+upgrade_database(app)
 
 with app.app_context():
     # Clear existing data (optional)
     print("Clearing existing data...")
+    AttendanceSummary.query.delete()
     Attendance.query.delete()
     Enrollment.query.delete()
     Course.query.delete()
@@ -30,13 +33,15 @@ with app.app_context():
     # Create students
     print("Creating students...")
     students = []
+    # All students share a password, so hash it once
+    student_password_hash = app.extensions['password_hasher'].hash('student123')
     for i in range(1, 11):
         student = User(
             username=f'student{i}',
             email=f'student{i}@zitiacademy.com',
-            role='student'
+            role='student',
+            password_hash=student_password_hash
         )
-        student.set_password('student123')
         students.append(student)
         db.session.add(student)
     
@@ -68,13 +73,13 @@ with app.app_context():
     
     # Enroll students
     print("Enrolling students...")
-    for student in students:
+    for index, student in enumerate(students):
         # Enroll all in course1
         enrollment1 = Enrollment(student_id=student.id, course_id=course1.id)
         db.session.add(enrollment1)
         
         # Enroll first 5 in course2
-        if students.index(student) < 5:
+        if index < 5:
             enrollment2 = Enrollment(student_id=student.id, course_id=course2.id)
             db.session.add(enrollment2)
     
@@ -88,7 +93,7 @@ with app.app_context():
     for i in range(10):
         attendance_date = date.today() - timedelta(days=i)
         
-        for student in students:
+        for index, student in enumerate(students):
             # Course 1 attendance
             status = random.choices(statuses, weights)[0]
             attendance = Attendance(
@@ -101,7 +106,7 @@ with app.app_context():
             db.session.add(attendance)
             
             # Course 2 attendance (first 5 students only)
-            if students.index(student) < 5:
+            if index < 5:
                 status = random.choices(statuses, weights)[0]
                 attendance2 = Attendance(
                     student_id=student.id,
@@ -113,6 +118,7 @@ with app.app_context():
                 db.session.add(attendance2)
     
     db.session.commit()
+    rebuild_summary()
     
     print("\n=== Seed data created successfully ===")
     print(f"Admin: admin@zitiacademy.com / admin123")
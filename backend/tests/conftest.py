@@ -0,0 +1,132 @@
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# app.config reads the environment when it is first imported, so the test
+# database, signing keys and a cheap bcrypt cost are set before anything
+# imports the app
+DATABASE_DIR = tempfile.mkdtemp(prefix='zitiacademy-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(DATABASE_DIR, 'test.db')}"
+os.environ['SECRET_KEY'] = 'test-secret-key-' + 'x' * 32
+os.environ['JWT_SECRET_KEY'] = 'test-jwt-secret-key-' + 'x' * 32
+os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+
+@pytest.fixture(scope='session')
+def app():
+    """The app on a migrated, file-backed SQLite database"""
+    from app import create_app, upgrade_database
+    app = create_app()
+    app.config['TESTING'] = True
+    upgrade_database(app)
+    yield app
+    shutil.rmtree(DATABASE_DIR, ignore_errors=True)
+
+@pytest.fixture(autouse=True)
+def clean_database(app):
+    """Give every test empty tables and an empty report cache"""
+    from app.models import db
+    yield
+    with app.app_context():
+        db.session.remove()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+    app.extensions['report_cache'].clear()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager counting the SQL statements run inside it
+
+        with count_queries() as queries:
+            client.get(...)
+        assert queries.count == 3
+    """
+    from sqlalchemy import event
+    from app.models import db
+
+    class Counter:
+        count = 0
+
+    @contextmanager
+    def counting():
+        counter = Counter()
+
+        def on_execute(*args):
+            counter.count += 1
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', on_execute)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, 'before_cursor_execute', on_execute)
+
+    return counting
+
+class Factory:
+    """Insert users, courses, enrollments and attendance for a test"""
+
+    STATUSES = ('present', 'late', 'absent', 'excused')
+
+    def __init__(self, app):
+        self.app = app
+        self._serial = 0
+
+    def _next(self):
+        self._serial += 1
+        return self._serial
+
+    def user(self, role='student'):
+        from app.models import db, User
+        serial = self._next()
+        with self.app.app_context():
+            user = User(username=f'{role}{serial}', email=f'{role}{serial}@example.com', role=role, password_hash='x')
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+
+    def course(self, teacher_id, semester='Fall', year=2024):
+        from app.models import db, Course
+        serial = self._next()
+        with self.app.app_context():
+            course = Course(name=f'Course {serial}', code=f'C{serial}', teacher_id=teacher_id, semester=semester, year=year)
+            db.session.add(course)
+            db.session.commit()
+            return course.id
+
+    def enroll(self, course_id, student_ids, days=0, start=date(2024, 9, 2)):
+        """Enroll students and record ``days`` sessions of attendance for each"""
+        from app.models import db, Enrollment, Attendance
+        from app.utils.summary import rebuild_summary
+        with self.app.app_context():
+            for student_id in student_ids:
+                db.session.add(Enrollment(student_id=student_id, course_id=course_id))
+                for day in range(days):
+                    db.session.add(Attendance(
+                        student_id=student_id, course_id=course_id, date=start + timedelta(days=day),
+                        status=self.STATUSES[(student_id + day) % len(self.STATUSES)]
+                    ))
+            db.session.commit()
+            rebuild_summary()
+
+    def headers(self, user_id):
+        from flask_jwt_extended import create_access_token
+        with self.app.app_context():
+            return {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+@pytest.fixture
+def factory(app):
+    return Factory(app)
@@ -0,0 +1,83 @@
+import base64
+import pytest
+
+def test_bulk_mark_reports_every_error_with_its_index(client, factory):
+    admin = factory.user('admin')
+    teacher = factory.user('teacher')
+    student = factory.user()
+    course = factory.course(teacher)
+    factory.enroll(course, [student])
+
+    response = client.post('/api/attendance/bulk', headers=factory.headers(admin), json={'records': [
+        [1, 'x'],
+        {'student_id': factory.user(), 'course_id': course, 'date': '2024-09-02', 'status': 'present'},
+        {'student_id': student, 'course_id': course, 'date': '2024-09-02', 'status': 'present'},
+        'present',
+        {'student_id': student, 'course_id': course, 'date': '2024-09-03', 'status': 'gone'},
+        {'student_id': student, 'course_id': course, 'date': 'soon', 'status': 'late'},
+        {'student_id': student, 'course_id': course, 'status': 'late'}
+    ]})
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['created'] == 1
+    assert [(error['index'], error['error'].split('.')[0]) for error in data['errors']] == [
+        (0, 'Record must be an object'),
+        (1, 'Student not enrolled in this course'),
+        (3, 'Record must be an object'),
+        (4, 'Invalid status'),
+        (5, 'Invalid date'),
+        (6, 'date is required')
+    ]
+    assert all(set(error) == {'index', 'record', 'error'} for error in data['errors'])
+
+@pytest.fixture
+def listing(app, factory):
+    """A course with 21 attendance rows over 3 dates, so dates tie across pages"""
+    from app.models import Attendance
+    course = factory.course(factory.user('teacher'))
+    factory.enroll(course, [factory.user() for _ in range(7)], days=3)
+    with app.app_context():
+        expected = [row.id for row in Attendance.query.filter_by(course_id=course).order_by(
+            Attendance.date.desc(), Attendance.id.desc()
+        )]
+    return f'/api/attendance/course/{course}', expected, factory.headers(factory.user('admin'))
+
+def test_keyset_walk_has_no_duplicates_or_gaps(client, listing):
+    url, expected, headers = listing
+    seen, cursor = [], ''
+    while cursor is not None:
+        data = client.get(url, headers=headers, query_string={'cursor': cursor, 'per_page': 5}).get_json()['data']
+        assert 'total' not in data
+        seen += [item['id'] for item in data['items']]
+        cursor = data['next_cursor']
+
+    assert seen == expected
+
+def test_keyset_include_total(client, listing):
+    url, expected, headers = listing
+
+    data = client.get(url, headers=headers, query_string={'cursor': '', 'per_page': 5, 'include_total': 1}).get_json()['data']
+
+    assert data['total'] == len(expected)
+    assert [item['id'] for item in data['items']] == expected[:5]
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor', base64.urlsafe_b64encode(b'{}').decode(), base64.urlsafe_b64encode(b'[1]').decode(),
+    base64.urlsafe_b64encode(b'["soon", 1]').decode()
+])
+def test_malformed_cursor_returns_400(client, listing, cursor):
+    url, expected, headers = listing
+
+    response = client.get(url, headers=headers, query_string={'cursor': cursor})
+
+    assert response.status_code == 400
+
+def test_offset_pagination_is_unchanged(client, listing):
+    url, expected, headers = listing
+
+    data = client.get(url, headers=headers, query_string={'page': 2, 'per_page': 5}).get_json()['data']
+
+    assert set(data) == {'items', 'total', 'pages', 'page', 'per_page', 'has_next', 'has_prev'}
+    assert (data['total'], data['pages'], data['page'], data['has_next'], data['has_prev']) == (21, 5, 2, True, True)
+    assert [item['id'] for item in data['items']] == expected[5:10]
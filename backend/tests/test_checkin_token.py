@@ -0,0 +1,68 @@
+import pytest
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield app
+
+def test_valid_token_returns_its_course(ctx):
+    from app.utils.checkin_token import create_checkin_token, verify_checkin_token
+
+    assert verify_checkin_token(create_checkin_token(42)) == 42
+
+def test_tampered_signature_is_rejected(ctx):
+    from app.utils.checkin_token import create_checkin_token, verify_checkin_token
+    token = create_checkin_token(42)
+    payload, _, signature = token.rpartition(':')
+    flipped = ('A' if signature[0] != 'A' else 'B') + signature[1:]
+
+    assert verify_checkin_token(f'{payload}:{flipped}') is None
+
+def test_tampered_course_is_rejected(ctx):
+    from app.utils.checkin_token import create_checkin_token, verify_checkin_token
+    prefix, course_id, rest = create_checkin_token(42).split(':', 2)
+
+    assert verify_checkin_token(f'{prefix}:43:{rest}') is None
+
+def test_token_past_ttl_is_rejected(ctx):
+    from app.utils.checkin_token import create_checkin_token, current_window, verify_checkin_token
+    windows = ctx.config['CHECKIN_TOKEN_TTL'] // ctx.config['QR_ROTATION_SECONDS']
+
+    assert verify_checkin_token(create_checkin_token(42, current_window() - windows + 1)) == 42
+    assert verify_checkin_token(create_checkin_token(42, current_window() - windows - 1)) is None
+
+def test_token_for_future_window_is_rejected(ctx):
+    from app.utils.checkin_token import create_checkin_token, current_window, verify_checkin_token
+
+    assert verify_checkin_token(create_checkin_token(42, current_window() + 1)) is None
+
+@pytest.mark.parametrize('token', [
+    '', 'CI', 'CI:42', 'CI:42:1:AAAA', 'XX:42:1:AAAA:AAAA', 'CI:x:y:AAAA:AAAA',
+    'CI:42:1:ÄÄÄÄ:AAAA', 'CI:４２:1:AAAA:AAAA', None, 42, ['CI']
+])
+def test_malformed_token_is_rejected(ctx, token):
+    from app.utils.checkin_token import verify_checkin_token
+
+    assert verify_checkin_token(token) is None
+
+def test_checkin_accepts_valid_token_and_rejects_tampered_one(app, client, factory):
+    from app.utils.checkin_token import create_checkin_token
+    student = factory.user()
+    course = factory.course(factory.user('teacher'))
+    factory.enroll(course, [student])
+    with app.app_context():
+        token = create_checkin_token(course)
+    headers = factory.headers(student)
+
+    assert client.post('/api/attendance/checkin', headers=headers, json={'token': token[:-1] + '0'}).status_code == 400
+    assert client.post('/api/attendance/checkin', headers=headers, json={'token': token}).status_code == 200
+
+def test_checkin_token_is_not_a_bearer_token(app, client, factory):
+    from app.utils.checkin_token import create_checkin_token
+    course = factory.course(factory.user('teacher'))
+    with app.app_context():
+        token = create_checkin_token(course)
+
+    response = client.get('/api/auth/me', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code in (401, 422)
@@ -0,0 +1,36 @@
+import pytest
+
+def test_replace_with_empty_roster_clears_enrollments(client, factory):
+    admin = factory.user('admin')
+    teacher = factory.user('teacher')
+    students = [factory.user() for _ in range(3)]
+    course = factory.course(teacher)
+    factory.enroll(course, students)
+    headers = factory.headers(admin)
+
+    response = client.post(f'/api/courses/{course}/enroll', headers=headers, json={'student_ids': [], 'replace': True})
+
+    assert response.status_code == 200
+    assert response.get_json()['data']['removed_ids'] == students
+    roster = client.get(f'/api/courses/{course}/students', headers=headers).get_json()['data']
+    assert roster['total'] == 0
+
+def test_enroll_without_replace_still_requires_students(client, factory):
+    admin = factory.user('admin')
+    course = factory.course(factory.user('teacher'))
+
+    response = client.post(f'/api/courses/{course}/enroll', headers=factory.headers(admin), json={'student_ids': []})
+
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('student_ids', ['12', 12, {'1': 2}])
+def test_enroll_rejects_student_ids_that_are_not_a_list(app, client, factory, student_ids):
+    from app.models import Enrollment
+    admin = factory.user('admin')
+    course = factory.course(factory.user('teacher'))
+
+    response = client.post(f'/api/courses/{course}/enroll', headers=factory.headers(admin), json={'student_ids': student_ids})
+
+    assert response.status_code == 400
+    with app.app_context():
+        assert Enrollment.query.filter_by(course_id=course).count() == 0
@@ -0,0 +1,75 @@
+"""The hot-path queries are planned on the composite indexes"""
+import pytest
+from sqlalchemy import event
+
+@pytest.fixture
+def query_plans(app, client):
+    """Run a request and return (sql, plan) for each SELECT it issued
+
+    Plans come from EXPLAIN QUERY PLAN with the statement's own
+    parameters, so they describe the queries the routes really run.
+    """
+    from app.models import db
+
+    def plans(url, headers):
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+                statements.append((statement, parameters))
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', on_execute)
+        try:
+            response = client.get(url, headers=headers)
+            # Exports stream their rows, so read the whole body here
+            response.get_data()
+        finally:
+            event.remove(engine, 'before_cursor_execute', on_execute)
+        assert response.status_code == 200, response.get_json()
+
+        with engine.connect() as connection:
+            return [
+                (statement, ' | '.join(
+                    row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)
+                ))
+                for statement, parameters in statements
+            ]
+
+    return plans
+
+@pytest.fixture
+def dataset(factory):
+    admin = factory.user('admin')
+    teacher = factory.user('teacher')
+    students = [factory.user() for _ in range(5)]
+    courses = [factory.course(teacher) for _ in range(2)]
+    for course in courses:
+        factory.enroll(course, students, days=5)
+    return {
+        'admin': factory.headers(admin),
+        'teacher': factory.headers(teacher),
+        'students': students,
+        'courses': courses
+    }
+
+@pytest.mark.parametrize('role, url, index', [
+    # Course report over a date range, the course listing and the export
+    ('admin', '/api/reports/course/{course}?start_date=2024-09-01&end_date=2024-09-30',
+     'ix_attendance_course_date_status'),
+    ('admin', '/api/attendance/course/{course}', 'ix_attendance_course_date_status'),
+    ('admin', '/api/reports/export/{course}?format=csv', 'ix_attendance_course_date_status'),
+    # Student history
+    ('admin', '/api/attendance/student/{student}', 'ix_attendance_student_date'),
+    # Roster
+    ('admin', '/api/courses/{course}/students', 'ix_enrollments_course_id'),
+    # A teacher's own courses
+    ('teacher', '/api/courses', 'ix_courses_teacher_id')
+])
+def test_query_uses_index(query_plans, dataset, role, url, index):
+    url = url.format(course=dataset['courses'][0], student=dataset['students'][0])
+
+    plans = query_plans(url, dataset[role])
+
+    assert any(f'INDEX {index} ' in plan for _, plan in plans), '\n'.join(plan for _, plan in plans)
@@ -0,0 +1,59 @@
+import pytest
+
+# Endpoints a teacher may only call for courses they teach:
+# (method, url, JSON body)
+TEACHER_ENDPOINTS = [
+    ('get', '/api/courses/{course}', None),
+    ('get', '/api/courses/{course}/students', None),
+    ('get', '/api/courses/{course}/qrcode', None),
+    ('get', '/api/attendance/course/{course}', None),
+    ('get', '/api/reports/course/{course}', None),
+    ('get', '/api/reports/course/{course}/timeseries', None),
+    ('get', '/api/reports/export/{course}?format=csv', None),
+    ('put', '/api/courses/{course}', {'name': 'Renamed'}),
+    ('post', '/api/courses/{course}/enroll', {'student_ids': [0]}),
+    ('delete', '/api/courses/{course}/enroll/{student}', None),
+    ('delete', '/api/courses/{course}', None)
+]
+
+@pytest.fixture
+def course_setup(factory):
+    teacher = factory.user('teacher')
+    student = factory.user()
+    course = factory.course(teacher)
+    factory.enroll(course, [student], days=2)
+    return teacher, student, course
+
+def call(client, headers, method, url, body, **ids):
+    return getattr(client, method)(url.format(**ids), headers=headers, json=body)
+
+@pytest.mark.parametrize('method,url,body', TEACHER_ENDPOINTS)
+def test_owning_teacher_is_allowed(client, factory, course_setup, method, url, body):
+    teacher, student, course = course_setup
+
+    response = call(client, factory.headers(teacher), method, url, body, course=course, student=student)
+
+    assert response.status_code == 200
+
+@pytest.mark.parametrize('method,url,body', TEACHER_ENDPOINTS)
+def test_other_teacher_is_denied(client, factory, course_setup, method, url, body):
+    teacher, student, course = course_setup
+
+    response = call(client, factory.headers(factory.user('teacher')), method, url, body, course=course, student=student)
+
+    assert response.status_code == 403
+
+@pytest.mark.parametrize('url', ['/api/reports/student/{student}', '/api/attendance/student/{student}'])
+def test_student_reads_only_own_records(client, factory, course_setup, url):
+    teacher, student, course = course_setup
+    other = factory.user()
+
+    assert client.get(url.format(student=student), headers=factory.headers(student)).status_code == 200
+    assert client.get(url.format(student=student), headers=factory.headers(other)).status_code == 403
+
+def test_admin_cannot_delete_themselves(client, factory):
+    admin = factory.user('admin')
+
+    response = client.delete(f'/api/users/{admin}', headers=factory.headers(admin))
+
+    assert response.status_code == 400
@@ -0,0 +1,65 @@
+"""Endpoints issue a fixed number of SQL statements, whatever the data size"""
+
+def test_student_report_query_count_is_constant(client, factory, count_queries):
+    admin = factory.user('admin')
+    teacher = factory.user('teacher')
+    student = factory.user()
+    classmates = [factory.user() for _ in range(3)]
+    headers = factory.headers(admin)
+
+    counts = {}
+    enrolled = 0
+    for courses in (1, 8):
+        for _ in range(courses - enrolled):
+            factory.enroll(factory.course(teacher), [student, *classmates], days=5)
+        enrolled = courses
+
+        with count_queries() as queries:
+            response = client.get(f'/api/reports/student/{student}', headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()['data']['courses']) == courses
+        counts[courses] = queries.count
+
+    # The student, the cache versions, then courses with their counts,
+    # their teachers and their enrollment totals
+    assert counts == {1: 5, 8: 5}
+
+def _count_requests(client, factory, count_queries, url, sizes):
+    """Statement count of GET url on a new course, for each (courses, students)
+
+    Every size adds ``courses`` courses of ``students`` students each; url
+    is formatted with the first of them.
+    """
+    admin = factory.user('admin')
+    teacher = factory.user('teacher')
+    headers = factory.headers(admin)
+    counts = []
+    for courses, students in sizes:
+        added = [factory.course(teacher) for _ in range(courses)]
+        for course in added:
+            factory.enroll(course, [factory.user() for _ in range(students)], days=3)
+
+        with count_queries() as queries:
+            response = client.get(url.format(course=added[0]), headers=headers)
+        assert response.status_code == 200
+        counts.append(queries.count)
+    return counts
+
+def test_course_list_query_count_is_constant(client, factory, count_queries):
+    counts = _count_requests(client, factory, count_queries, '/api/courses?per_page=100', [(2, 3), (12, 10)])
+
+    # Courses, their teachers, the total and grouped enrollment counts
+    assert counts == [4, 4]
+
+def test_course_detail_query_count_is_constant(client, factory, count_queries):
+    counts = _count_requests(client, factory, count_queries, '/api/courses/{course}', [(1, 3), (1, 30)])
+
+    # The course, its enrollments, its teacher and the enrolled students
+    assert counts == [4, 4]
+
+def test_course_report_query_count_is_constant(client, factory, count_queries):
+    counts = _count_requests(client, factory, count_queries, '/api/reports/course/{course}', [(1, 3), (1, 30)])
+
+    # The course, the status totals, the per-student summaries and the
+    # teacher
+    assert counts == [4, 4]
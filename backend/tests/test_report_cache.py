@@ -0,0 +1,121 @@
+import pytest
+
+@pytest.fixture
+def reports(app, factory):
+    """A course with two students, two sessions of history and an admin"""
+    from app.models import Attendance
+    teacher = factory.user('teacher')
+    student, other = factory.user(), factory.user()
+    course = factory.course(teacher)
+    factory.enroll(course, [student, other], days=2)
+    with app.app_context():
+        record = Attendance.query.filter_by(student_id=student).order_by(Attendance.date).first()
+        attendance = {'id': record.id, 'status': record.status}
+    return {
+        'course': course,
+        'student': student,
+        'other': other,
+        'attendance': attendance,
+        'headers': factory.headers(factory.user('admin')),
+        'urls': {
+            'course': f'/api/reports/course/{course}',
+            'student': f'/api/reports/student/{student}',
+            'timeseries': f'/api/reports/course/{course}/timeseries'
+        }
+    }
+
+def new_status(status):
+    return 'absent' if status != 'absent' else 'present'
+
+def mark(client, ctx):
+    return client.post('/api/attendance', headers=ctx['headers'], json={
+        'student_id': ctx['student'], 'course_id': ctx['course'], 'date': '2024-09-04', 'status': 'absent'
+    })
+
+def bulk(client, ctx):
+    return client.post('/api/attendance/bulk', headers=ctx['headers'], json={'records': [
+        {'student_id': student, 'course_id': ctx['course'], 'date': '2024-09-04', 'status': 'late'}
+        for student in (ctx['student'], ctx['other'])
+    ]})
+
+def update(client, ctx):
+    attendance = ctx['attendance']
+    return client.put(f"/api/attendance/{attendance['id']}", headers=ctx['headers'], json={
+        'status': new_status(attendance['status'])
+    })
+
+def delete(client, ctx):
+    return client.delete(f"/api/attendance/{ctx['attendance']['id']}", headers=ctx['headers'])
+
+def enroll(client, ctx):
+    return client.post(f"/api/courses/{ctx['course']}/enroll", headers=ctx['headers'], json={
+        'student_ids': [ctx['new_student']]
+    })
+
+def replace_roster(client, ctx):
+    return client.post(f"/api/courses/{ctx['course']}/enroll", headers=ctx['headers'], json={
+        'student_ids': [ctx['student']], 'replace': True
+    })
+
+def unenroll(client, ctx):
+    return client.delete(f"/api/courses/{ctx['course']}/enroll/{ctx['other']}", headers=ctx['headers'])
+
+def update_course(client, ctx):
+    return client.put(f"/api/courses/{ctx['course']}", headers=ctx['headers'], json={'name': 'Renamed'})
+
+def update_user(client, ctx):
+    return client.put(f"/api/users/{ctx['student']}", headers=ctx['headers'], json={'username': 'renamed'})
+
+# write -> reports whose content it changes
+WRITES = {
+    'mark': (mark, ('course', 'student', 'timeseries')),
+    'bulk': (bulk, ('course', 'student', 'timeseries')),
+    'update': (update, ('course', 'student', 'timeseries')),
+    'delete': (delete, ('course', 'student', 'timeseries')),
+    'enroll': (enroll, ('course', 'student')),
+    'replace_roster': (replace_roster, ('course', 'student')),
+    'unenroll': (unenroll, ('course', 'student')),
+    'update_course': (update_course, ('course', 'student')),
+    'update_user': (update_user, ('course', 'student'))
+}
+
+def fetch(client, ctx, url, etag=None):
+    headers = dict(ctx['headers'])
+    if etag:
+        headers['If-None-Match'] = etag
+    return client.get(url, headers=headers)
+
+@pytest.mark.parametrize('write', WRITES)
+def test_write_invalidates_cached_reports(client, factory, reports, write):
+    perform, affected = WRITES[write]
+    reports['new_student'] = factory.user()
+    before = {}
+    for name, url in reports['urls'].items():
+        assert fetch(client, reports, url).headers['X-Cache'] == 'MISS'
+        response = fetch(client, reports, url)
+        assert response.headers['X-Cache'] == 'HIT'
+        before[name] = response
+
+    assert perform(client, reports).status_code in (200, 201)
+
+    for name in affected:
+        url, old = reports['urls'][name], before[name]
+        response = fetch(client, reports, url)
+        assert response.headers['X-Cache'] == 'MISS', name
+        assert response.get_json() != old.get_json(), name
+        assert fetch(client, reports, url, etag=old.headers['ETag']).status_code == 200, name
+
+def test_remark_with_same_status_keeps_cached_reports(app, client, reports):
+    from app.models import db, Attendance
+    with app.app_context():
+        record = db.session.get(Attendance, reports['attendance']['id'])
+        payload = {'student_id': record.student_id, 'course_id': record.course_id,
+                   'date': record.date.isoformat(), 'status': record.status}
+    for url in reports['urls'].values():
+        fetch(client, reports, url)
+
+    response = client.post('/api/attendance', headers=reports['headers'], json=payload)
+
+    assert response.status_code in (200, 201)
+    for url in reports['urls'].values():
+        assert fetch(client, reports, url).headers['X-Cache'] == 'HIT', url
@@ -0,0 +1,136 @@
+from datetime import date, timedelta
+import pytest
+
+def test_owning_teacher_can_read_timeseries(client, factory):
+    teacher = factory.user('teacher')
+    course = factory.course(teacher)
+    factory.enroll(course, [factory.user()], days=3)
+
+    response = client.get(f'/api/reports/course/{course}/timeseries', headers=factory.headers(teacher))
+
+    assert response.status_code == 200
+
+def test_other_teacher_cannot_read_timeseries(client, factory):
+    course = factory.course(factory.user('teacher'))
+
+    response = client.get(f'/api/reports/course/{course}/timeseries', headers=factory.headers(factory.user('teacher')))
+
+    assert response.status_code == 403
+
+def test_admin_at_risk_requires_a_scope(client, factory):
+    admin = factory.user('admin')
+    course = factory.course(factory.user('teacher'), semester='Fall', year=2024)
+    factory.enroll(course, [factory.user()], days=3)
+    headers = factory.headers(admin)
+
+    assert client.get('/api/reports/at-risk', headers=headers).status_code == 400
+    assert client.get('/api/reports/at-risk?semester=Fall', headers=headers).status_code == 400
+    assert client.get('/api/reports/at-risk?semester=Fall&year=2024', headers=headers).status_code == 200
+    assert client.get(f'/api/reports/at-risk?course_id={course}', headers=headers).status_code == 200
+
+def test_teacher_at_risk_is_scoped_to_own_courses(client, factory):
+    teacher = factory.user('teacher')
+    factory.enroll(factory.course(teacher), [factory.user()], days=3)
+
+    response = client.get('/api/reports/at-risk', headers=factory.headers(teacher))
+
+    assert response.status_code == 200
+
+def test_at_risk_rejects_window_above_limit(client, factory):
+    from app.routes.reports import AT_RISK_MAX_WINDOW
+    course = factory.course(factory.user('teacher'))
+    headers = factory.headers(factory.user('admin'))
+
+    response = client.get(f'/api/reports/at-risk?course_id={course}&window={AT_RISK_MAX_WINDOW + 1}', headers=headers)
+
+    assert response.status_code == 400
+
+@pytest.mark.parametrize('code', ['BIO 101', 'Биология 101'])
+def test_csv_export_filename_is_encoded_like_xlsx(app, client, factory, code):
+    from app.models import db, Course
+    course = factory.course(factory.user('teacher'))
+    with app.app_context():
+        db.session.get(Course, course).code = code
+        db.session.commit()
+    headers = factory.headers(factory.user('admin'))
+
+    dispositions = {}
+    for format_type in ('csv', 'xlsx'):
+        response = client.get(f'/api/reports/export/{course}?format={format_type}', headers=headers)
+        assert response.status_code == 200
+        dispositions[format_type] = response.headers['Content-Disposition']
+
+    assert dispositions['csv'] == dispositions['xlsx'].replace('.xlsx', '.csv')
+    dispositions['csv'].encode('latin-1')
+    assert 'filename="attendance_' in dispositions['csv']
+
+# Statuses of each student over four sessions, oldest first
+AT_RISK_HISTORY = {
+    'streak_3': 'PAAA',    # streak 3, rate 50 -> 0
+    'streak_2': 'PPAA',    # streak 2, rate 100 -> 0
+    'rate_drop': 'PPLA',   # streak 1, rate 100 -> 50
+    'steady': 'PPPP',
+    'recovered': 'AAPP'    # streak 0, rate 0 -> 100
+}
+
+@pytest.fixture
+def at_risk_course(app, factory):
+    from app.models import db, Attendance
+    statuses = {'P': 'present', 'L': 'late', 'A': 'absent'}
+    course = factory.course(factory.user('teacher'))
+    students = {name: factory.user() for name in AT_RISK_HISTORY}
+    factory.enroll(course, students.values())
+    with app.app_context():
+        for name, history in AT_RISK_HISTORY.items():
+            for day, status in enumerate(history):
+                db.session.add(Attendance(
+                    student_id=students[name], course_id=course,
+                    date=date(2024, 9, 2) + timedelta(days=day), status=statuses[status]
+                ))
+        db.session.commit()
+    return course, students
+
+def at_risk(client, factory, course):
+    response = client.get(
+        f'/api/reports/at-risk?course_id={course}&window=2&streak=2&drop=20',
+        headers=factory.headers(factory.user('admin'))
+    )
+    assert response.status_code == 200
+    return [
+        (item['student']['id'], item['absence_streak'], item['recent_rate'], item['prior_rate'], item['rate_change'])
+        for item in response.get_json()['data']['items']
+    ]
+
+def test_at_risk_flags_streaks_and_rate_drops_worst_first(client, factory, at_risk_course):
+    course, students = at_risk_course
+
+    assert at_risk(client, factory, course) == [
+        (students['streak_3'], 3, 0.0, 50.0, -50.0),
+        (students['streak_2'], 2, 0.0, 100.0, -100.0),
+        (students['rate_drop'], 1, 50.0, 100.0, -50.0)
+    ]
+
+@pytest.mark.parametrize('versions', [None, {}])
+def test_at_risk_materializes_cutoffs_only_where_supported(app, client, factory, at_risk_course, monkeypatch, versions):
+    from sqlalchemy import event
+    from app.models import db
+    from app.routes import reports
+    if versions is not None:
+        monkeypatch.setattr(reports, 'MATERIALIZED_CTE_VERSIONS', versions)
+    course, students = at_risk_course
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        rows = at_risk(client, factory, course)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    assert [row[0] for row in rows] == [students['streak_3'], students['streak_2'], students['rate_drop']]
+    materialized = any('AS MATERIALIZED' in statement for statement in statements)
+    assert materialized == (versions is None)
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from sqlalchemy import text
+
+def test_search_verify_passes_after_migrations(app):
+    result = app.test_cli_runner().invoke(args=['search', 'verify'])
+
+    assert result.exit_code == 0, result.output
+    assert 'in place' in result.output
+
+def test_search_verify_reports_dropped_trigger(app, client, factory):
+    from flask_migrate import downgrade, upgrade
+    from app.models import db
+
+    with app.app_context():
+        db.session.execute(text('DROP TRIGGER users_fts_au'))
+        db.session.commit()
+    try:
+        result = app.test_cli_runner().invoke(args=['search', 'verify'])
+        assert result.exit_code != 0
+        assert 'users_fts_au' in result.output
+    finally:
+        with app.app_context():
+            db.session.remove()
+            downgrade(revision='0004')
+            upgrade()
+
+    # The recreated index follows writes again
+    from app.models import User
+    admin = factory.user('admin')
+    student = factory.user()
+    with app.app_context():
+        username = db.session.get(User, student).username
+    response = client.get(f'/api/users?search={username}', headers=factory.headers(admin))
+    assert [user['id'] for user in response.get_json()['data']['items']] == [student]
+
+def test_db_check_ignores_search_index_tables(app):
+    # Autogenerate would otherwise drop the FTS5 tables, which have no models
+    result = app.test_cli_runner().invoke(args=['db', 'check'])
+
+    assert result.exit_code == 0, result.output
+
+def test_exact_username_ranks_above_longer_completion(app, client, factory):
+    from app.models import db, User
+    admin = factory.user('admin')
+    newer, exact = factory.user(), factory.user()
+    with app.app_context():
+        # The completion is created later, so created_at ordering alone would list it first
+        db.session.get(User, exact).username = 'john'
+        db.session.get(User, newer).username = 'johnny'
+        db.session.get(User, newer).created_at = db.session.get(User, exact).created_at + timedelta(days=1)
+        db.session.commit()
+
+    response = client.get('/api/users?search=john', headers=factory.headers(admin))
+
+    assert [user['username'] for user in response.get_json()['data']['items']] == ['john', 'johnny']
+
+def test_every_word_must_match(app, client, factory):
+    from app.models import db, User
+    admin = factory.user('admin')
+    both, first_only = factory.user(), factory.user()
+    with app.app_context():
+        db.session.get(User, both).username = 'ann lee'
+        db.session.get(User, first_only).username = 'ann smith'
+        db.session.commit()
+
+    response = client.get('/api/users?search=ann le', headers=factory.headers(admin))
+
+    assert [user['id'] for user in response.get_json()['data']['items']] == [both]
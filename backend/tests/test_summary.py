@@ -0,0 +1,115 @@
+from datetime import date
+import pytest
+
+def summary_counts(app, student_id, course_id):
+    """Per-status counts of one summary row, checked against raw attendance"""
+    from app.models import db, AttendanceSummary
+    from app.utils.summary import verify_summary
+    with app.app_context():
+        assert verify_summary() == []
+        row = db.session.get(AttendanceSummary, (student_id, course_id))
+        return {status: getattr(row, status) for status in ('total', 'present', 'late', 'absent', 'excused')}
+
+def counts(present=0, late=0, absent=0, excused=0):
+    return {'total': present + late + absent + excused, 'present': present, 'late': late, 'absent': absent, 'excused': excused}
+
+@pytest.fixture
+def enrolled(factory):
+    teacher = factory.user('teacher')
+    student = factory.user()
+    course = factory.course(teacher)
+    factory.enroll(course, [student])
+    return student, course, factory.headers(teacher)
+
+@pytest.fixture
+def coalesce(app, monkeypatch):
+    """Write check-ins through the batching writer"""
+    from app.utils.checkin_buffer import CheckinBuffer
+    monkeypatch.setitem(app.config, 'CHECKIN_COALESCE', True)
+    monkeypatch.setitem(app.extensions, 'checkin_buffer', None)
+    CheckinBuffer(app)
+
+def mark(client, headers, student, course, status, day='2024-09-02'):
+    response = client.post('/api/attendance', headers=headers, json={
+        'student_id': student, 'course_id': course, 'date': day, 'status': status
+    })
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json()['data']['id']
+
+def test_mark_insert_then_status_change(app, client, enrolled):
+    student, course, headers = enrolled
+
+    mark(client, headers, student, course, 'present')
+    assert summary_counts(app, student, course) == counts(present=1)
+
+    mark(client, headers, student, course, 'absent')
+    assert summary_counts(app, student, course) == counts(absent=1)
+
+    mark(client, headers, student, course, 'late', day='2024-09-03')
+    assert summary_counts(app, student, course) == counts(late=1, absent=1)
+
+def test_bulk_with_duplicate_keys_counts_last_record(app, client, enrolled):
+    student, course, headers = enrolled
+    mark(client, headers, student, course, 'excused', day='2024-09-03')
+
+    response = client.post('/api/attendance/bulk', headers=headers, json={'records': [
+        {'student_id': student, 'course_id': course, 'date': '2024-09-02', 'status': 'present'},
+        {'student_id': student, 'course_id': course, 'date': '2024-09-02', 'status': 'late'},
+        {'student_id': student, 'course_id': course, 'date': '2024-09-03', 'status': 'absent'},
+        {'student_id': student, 'course_id': course, 'date': '2024-09-03', 'status': 'absent'}
+    ]})
+
+    assert response.status_code == 200
+    assert summary_counts(app, student, course) == counts(late=1, absent=1)
+
+@pytest.mark.parametrize('mode', ['direct', 'coalesce'])
+def test_checkin_counts_present(app, client, enrolled, factory, request, mode):
+    from app.utils.checkin_token import create_checkin_token
+    if mode == 'coalesce':
+        request.getfixturevalue('coalesce')
+    student, course, headers = enrolled
+    mark(client, headers, student, course, 'absent', day=date.today().isoformat())
+    with app.app_context():
+        token = create_checkin_token(course)
+
+    for _ in range(2):
+        response = client.post('/api/attendance/checkin', headers=factory.headers(student), json={'token': token})
+        assert response.status_code == 200, response.get_json()
+
+    assert summary_counts(app, student, course) == counts(present=1)
+    if mode == 'coalesce':
+        assert app.extensions['checkin_buffer']._thread is not None
+
+def test_update_present_to_absent(app, client, enrolled):
+    student, course, headers = enrolled
+    attendance_id = mark(client, headers, student, course, 'present')
+
+    response = client.put(f'/api/attendance/{attendance_id}', headers=headers, json={'status': 'absent'})
+
+    assert response.status_code == 200
+    assert summary_counts(app, student, course) == counts(absent=1)
+
+def test_delete_removes_count(app, client, enrolled):
+    student, course, headers = enrolled
+    attendance_id = mark(client, headers, student, course, 'present')
+    mark(client, headers, student, course, 'late', day='2024-09-03')
+
+    response = client.delete(f'/api/attendance/{attendance_id}', headers=headers)
+
+    assert response.status_code == 200
+    assert summary_counts(app, student, course) == counts(late=1)
+
+def test_summary_verify_fails_on_tampered_row(app, client, enrolled):
+    from app.models import db, AttendanceSummary
+    student, course, headers = enrolled
+    mark(client, headers, student, course, 'present')
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['summary', 'verify']).exit_code == 0
+
+    with app.app_context():
+        db.session.get(AttendanceSummary, (student, course)).absent += 1
+        db.session.commit()
+    result = runner.invoke(args=['summary', 'verify'])
+
+    assert result.exit_code != 0
+    assert f'student {student}, course {course}' in result.output